@@ -0,0 +1,36 @@
+import numpy as np
+
+
+def interpolate_landmarks(landmark_store, sampled_frames, stride):
+    """
+    Fills the frames between consecutive sampled detections by linear interpolation.
+
+    Only gaps bounded by two sampled frames that both found a pose (at most `stride`
+    apart) are filled, so a missed detection is never bridged. Returns the number
+    of frames filled in.
+    """
+    detected = landmark_store.detected
+    known = sampled_frames[detected[sampled_frames]]
+    if len(known) < 2:
+        return 0
+    targets = np.setdiff1d(np.arange(known[0], known[-1] + 1), sampled_frames)
+    right_pos = np.searchsorted(known, targets, side='right')
+    left, right = known[right_pos - 1], known[right_pos]
+    fillable = (right - left) <= stride
+    targets, left, right = targets[fillable], left[fillable], right[fillable]
+    if len(targets) == 0:
+        return 0
+
+    weights = ((targets - left) / (right - left)).astype(np.float32)[:, None, None]
+    landmarks = landmark_store.landmarks
+    interpolated = landmarks[left] * (1 - weights) + landmarks[right] * weights
+    for frame_idx, values in zip(targets, interpolated):
+        landmark_store.set(int(frame_idx), values, interpolated=True)
+    return len(targets)
+
+
+def refinement_window(backswing_frame, impact_frame, margin_frames, frame_count):
+    """The [start, stop) frame range to re-run densely around the backswing-to-impact region."""
+    start = max(0, min(backswing_frame, impact_frame) - margin_frames)
+    stop = min(frame_count, max(backswing_frame, impact_frame) + margin_frames + 1)
+    return start, stop
@@ -1,92 +1,124 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import json
 import os
+import tempfile
 import time
 from datetime import datetime
 
 # Import the bonus features module
 from bonus.analysis_enhancer import BonusAnalyzer
+from bonus.reference_library import library_fingerprint
+from landmark_store import LandmarkStore, landmarks_to_array
+from metrics_store import MetricsStore
+from metrics_engine import calculate_angle, compute_frame_metrics, compute_metrics_batch
+from parallel_pose import extract_landmarks_parallel
+from pipeline import ThreadedPipeline, capture_info, read_frames, print_pipeline_stats
+from artifact import save_artifact, load_artifact
+from settings import DEFAULT_CONFIG, load_config, merge_config, freeze, thaw
+from pose_pool import get_pose_pool
+from adaptive import interpolate_landmarks, refinement_window
+from roi import InferenceRegion
+from scoring import evaluate_shot
+from overlay_renderer import OverlayRenderer
+from instrumentation import Profiler, JsonlSink
+
+POSE_OPTIONS = {"min_detection_confidence": 0.5, "min_tracking_confidence": 0.5}
+# Used for any output profile setting missing from config.json.
+DEFAULT_OUTPUT_PROFILE = {"video": True, "frames": "all", "codec": "mp4v", "scale": 1.0,
+                          "pre_impact_seconds": 1.5, "post_impact_seconds": 1.0}
+
+def create_run_dir(output_dir, prefix="analysis"):
+    """
+    Creates a new, uniquely named <prefix>_<timestamp>_<suffix> folder under output_dir.
+
+    The random suffix (from mkdtemp, which never reuses an existing name) keeps runs
+    started in the same second, in threads or separate processes, from colliding.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return tempfile.mkdtemp(prefix=f"{prefix}_{timestamp}_", dir=output_dir)
 
 class PoseAnalyzer:
     """
     A class to analyze a cricket cover drive from a video file.
     """
-    def __init__(self, input_video_path, output_dir='output'):
+    def __init__(self, input_video_path, output_dir='output', workers=None, config=None, run_dir=None, mode=None,
+                 progress_callback=None, output_profile=None, metrics_sink=None, video_info=None):
         self.input_video_path = input_video_path
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.output_dir = os.path.join(output_dir, f"analysis_{timestamp}")
+        # Header metadata (pipeline.probe_video) the caller already read, so the video is not probed twice.
+        self.video_info = video_info
+        if run_dir is None:
+            run_dir = create_run_dir(output_dir)
+        self.output_dir = run_dir
         os.makedirs(self.output_dir, exist_ok=True)
         print(f"Saving results to: {self.output_dir}")
         
-        self.config = self._load_config()
-
-        self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5)
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.metrics_over_time = {
-            'front_elbow_angle': [], 'spine_lean': [],
-            'head_knee_alignment': [], 'front_foot_direction': [],
-            'wrist_y_coords': [], 'hip_y_coords': []
-        }
+        self.config = freeze(config) if config is not None else self._load_config()
+        processing = self.config.get('processing', {})
+        # Number of worker processes for pose extraction; 1 keeps the serial single-core path.
+        self.workers = workers if workers is not None else processing.get('workers', 1)
+        self.shard_overlap_frames = processing.get('shard_overlap_frames', 30)
+        self.queue_size = processing.get('queue_size', 8)
+        self.pose_pool_size = processing.get('pose_pool_size', 2)
+        # "full" runs pose on every frame; "adaptive" samples every k-th frame and refines around impact.
+        self.mode = mode if mode is not None else processing.get('mode', 'full')
+        self.adaptive_stride = processing.get('adaptive_stride', 4)
+        self.refine_margin_frames = processing.get('refine_margin_frames', 15)
+        self.refine_warmup_frames = processing.get('refine_warmup_frames', 10)
+        # Optional batter crop and downscale applied to frames before pose inference.
+        self.inference_region = InferenceRegion.from_config(self.config)
+        self.inference_calls = 0
+        self.pipeline_stats = {}
+        # Called as progress_callback(stage, frames_done, frame_count) while frames are processed.
+        self.progress_callback = progress_callback
+        self.frame_count = 0
+        # Which annotated video generate_outputs writes: "full", "preview", "highlight", "metrics_only", ...
+        self.output_profile = output_profile or self.config.get('output', {}).get('profile', 'full')
+        if output_profile is not None:
+            self._output_settings()  # fail fast on a requested profile that does not exist, before any frame is decoded
+        self.impact_frame = None
+        # Stage timings for timings.json; `metrics_sink(report)` (or instrumentation.sink_path) also receives them.
+        instrumentation = self.config.get('instrumentation', {})
+        if metrics_sink is None and instrumentation.get('sink_path'):
+            metrics_sink = JsonlSink(instrumentation['sink_path'])
+        self.profiler = Profiler(instrumentation.get('enabled', True), metrics_sink)
+        self.pose_frames = 0
+        self.detections = 0
+        self.first_pass_seconds = None
+
+        self._pose = None
+        self.renderer = OverlayRenderer()
+        self.metrics_over_time = MetricsStore()
         self.phases_per_frame = []
+        self.landmark_store = LandmarkStore()
+        self.fps = 0.0
+        self.frame_width = 0
+        self.frame_height = 0
+        self.artifact_path = ""
+
+    @property
+    def pose(self):
+        """A pooled MediaPipe Pose graph, checked out on first use so re-scoring never needs one."""
+        if self._pose is None:
+            self._pose = get_pose_pool(self.pose_pool_size, POSE_OPTIONS).acquire()
+        return self._pose
+
+    def _close_pose(self):
+        """Returns the estimator to the pool, which resets its tracking state for the next video."""
+        if self._pose is not None:
+            get_pose_pool(self.pose_pool_size, POSE_OPTIONS).release(self._pose)
+            self._pose = None
 
     def _load_config(self):
-        """Loads thresholds and reference data from config.json."""
-        try:
-            with open('config.json', 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            print("Warning: config.json not found. Using default values.")
-            return {
-                "feedback_thresholds": {"good_elbow_angle": 160, "head_alignment_ratio": 0.5},
-                "reference_drive": {
-                    "impact_metrics": {
-                        "front_elbow_angle": {"min": 165, "max": 180, "weight": 0.4},
-                        "spine_lean": {"min": 10, "max": 25, "weight": 0.3}
-                    }
-                }
-            }
+        return load_config()
 
     def _calculate_angle(self, a, b, c):
-        a = np.array(a); b = np.array(b); c = np.array(c)
-        radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
-        angle = np.abs(radians * 180.0 / np.pi)
-        if angle > 180.0:
-            angle = 360 - angle
-        return angle
+        return calculate_angle(a, b, c)
 
     def _calculate_metrics(self, landmarks, frame_width, frame_height):
-        metrics = {}
-        try:
-            shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y * frame_height]
-            elbow = [landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].y * frame_height]
-            wrist = [landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_WRIST.value].y * frame_height]
-            hip_l = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y * frame_height]
-            hip_r = [landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].y * frame_height]
-            shoulder_l = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y * frame_height]
-            shoulder_r = [landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y * frame_height]
-            nose = [landmarks[self.mp_pose.PoseLandmark.NOSE.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.NOSE.value].y * frame_height]
-            knee = [landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].y * frame_height]
-            heel = [landmarks[self.mp_pose.PoseLandmark.LEFT_HEEL.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_HEEL.value].y * frame_height]
-            foot_index = [landmarks[self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].x * frame_width, landmarks[self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].y * frame_height]
-            
-            hip_midpoint = [(hip_l[0] + hip_r[0]) / 2, (hip_l[1] + hip_r[1]) / 2]
-
-            metrics['front_elbow_angle'] = self._calculate_angle(shoulder, elbow, wrist)
-            shoulder_midpoint = [(shoulder_l[0] + shoulder_r[0]) / 2, (shoulder_l[1] + shoulder_r[1]) / 2]
-            metrics['spine_lean'] = self._calculate_angle(hip_midpoint, shoulder_midpoint, [shoulder_midpoint[0], hip_midpoint[1]])
-            shoulder_width = abs(shoulder_l[0] - shoulder_r[0])
-            metrics['head_knee_alignment'] = abs(nose[0] - knee[0]) / shoulder_width if shoulder_width > 0 else 0
-            metrics['front_foot_direction'] = self._calculate_angle([heel[0] + 100, heel[1]], heel, foot_index)
-            metrics['wrist_y_coords'] = wrist[1]
-            metrics['hip_y_coords'] = hip_midpoint[1]
-
-        except Exception as e:
-            print(f"Error calculating metrics: {e}")
-            return None
-        return metrics
+        """Per-frame metrics for a single landmark list; whole videos go through compute_metrics_batch."""
+        return compute_frame_metrics(landmarks, frame_width, frame_height)
 
     def _generate_feedback(self, metrics):
         feedback = {}
@@ -101,76 +133,155 @@ class PoseAnalyzer:
             feedback['head'] = ("Lean head forward", (0, 0, 255))
         return feedback
 
-    def _draw_overlays(self, frame, metrics, feedback, landmarks, current_phase=""):
-        self.mp_drawing.draw_landmarks(frame, landmarks, self.mp_pose.POSE_CONNECTIONS, self.mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2), self.mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2))
-        frame_height, _, _ = frame.shape
-        dashboard_start_y = frame_height - 220
-        sub_img = frame[dashboard_start_y:frame_height, 0:450]; white_rect = np.ones(sub_img.shape, dtype=np.uint8) * 50
-        res = cv2.addWeighted(sub_img, 0.5, white_rect, 0.5, 1.0); frame[dashboard_start_y:frame_height, 0:450] = res
-        
-        if current_phase:
-            cv2.putText(frame, f"Phase: {current_phase}", (10, dashboard_start_y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 0), 2)
-
-        text_start_y = dashboard_start_y + 70
-        if 'front_elbow_angle' in metrics: cv2.putText(frame, f"Elbow Angle: {int(metrics['front_elbow_angle'])} deg", (10, text_start_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        if 'spine_lean' in metrics: cv2.putText(frame, f"Spine Lean: {int(metrics['spine_lean'])} deg", (10, text_start_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        if 'head_knee_alignment' in metrics: cv2.putText(frame, f"Head Align: {metrics['head_knee_alignment']:.2f} (ratio)", (10, text_start_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        if 'elbow' in feedback: cv2.putText(frame, feedback['elbow'][0], (10, text_start_y + 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback['elbow'][1], 2)
-        if 'head' in feedback: cv2.putText(frame, feedback['head'][0], (10, text_start_y + 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback['head'][1], 2)
-        return frame
+    def _draw_overlays(self, frame, metrics, feedback, frame_index, current_phase=""):
+        return self.renderer.draw(frame, self.landmark_store.get(frame_index), metrics, feedback, current_phase)
 
     def _generate_final_evaluation(self, impact_frame_index=None):
-        evaluation = {}
-        avg_foot_angle = np.mean(self.metrics_over_time['front_foot_direction'])
-        evaluation['Footwork'] = {'score': 8.5 if 45 < avg_foot_angle < 90 else 4.0, 'feedback': "Ensure the front foot points towards the cover region."}
-        good_head_frames = sum(1 for x in self.metrics_over_time['head_knee_alignment'] if x < 0.5)
-        evaluation['Head Position'] = {'score': round((good_head_frames / len(self.metrics_over_time['head_knee_alignment'])) * 10, 1), 'feedback': "A stable head over the front knee is crucial for balance."}
-        
-        if impact_frame_index is not None and impact_frame_index < len(self.metrics_over_time['front_elbow_angle']):
-            elbow_at_impact = self.metrics_over_time['front_elbow_angle'][impact_frame_index]
-            swing_score = (elbow_at_impact / 180) * 10
-            feedback_swing = f"Elbow angle at impact was {int(elbow_at_impact)}°. Aim for full extension."
-        else:
-            max_elbow_angle = max(self.metrics_over_time['front_elbow_angle'])
-            swing_score = (max_elbow_angle / 180) * 10
-            feedback_swing = "Aim for a full extension of the front arm through the shot."
-
-        evaluation['Swing Control'] = {'score': round(swing_score, 1), 'feedback': feedback_swing}
-        
-        spine_lean_std = np.std(self.metrics_over_time['spine_lean'])
-        balance_score = max(1, min(10, 10 - (spine_lean_std / 10) * 10))
-        evaluation['Balance'] = {'score': round(balance_score, 1), 'feedback': "Maintain a consistent and stable posture."}
-        evaluation['Follow-through'] = {'score': 7.5, 'feedback': "A high and complete follow-through ensures commitment."}
-        
-        return evaluation
+        return evaluate_shot(self.metrics_over_time, impact_frame_index)
 
     def process_video_first_pass(self):
         """First pass through the video to gather all landmark data without writing video."""
         print("Starting first pass: Data gathering...")
         cap = cv2.VideoCapture(self.input_video_path)
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        info = self.video_info if self.video_info is not None else capture_info(cap)
+        frame_width, frame_height, frame_count = info['width'], info['height'], info['frame_count']
+        self.frame_count = frame_count
+        self.fps = info['fps']
+        self.frame_width, self.frame_height = frame_width, frame_height
+        self.inference_calls = 0
+        self.pose_frames = self.detections = 0
+        start = time.perf_counter()
+        try:
+            if self.mode == 'adaptive':
+                self._extract_adaptive(cap, frame_count)
+            elif self.workers > 1:
+                cap.release()
+                with self.profiler.stage("pose_parallel"):
+                    self.landmark_store = extract_landmarks_parallel(self.input_video_path, frame_count, self.workers, POSE_OPTIONS,
+                                                                     self.shard_overlap_frames, dict(self.config.get('inference', {})))
+                self.inference_calls = self.pose_frames = int(self.landmark_store.frame_count)
+                self.detections = int(self.landmark_store.detected.sum())
+                self._report_progress("analysis", self.landmark_store.frame_count)
+            else:
+                self.landmark_store = LandmarkStore(frame_count)
+                self._run_inference(read_frames(cap, convert_to_rgb=self._decode_rgb, profiler=self._frame_profiler), "analysis")
+        finally:
+            cap.release()
+            self._close_pose()
+        with self.profiler.stage("metrics"):
+            self._update_metrics()
+        with self.profiler.stage("artifact"):
+            self.artifact_path = save_artifact(self.output_dir, self.landmark_store, self.metrics_over_time,
+                                               self.fps, frame_width, frame_height, self.input_video_path)
+        self.first_pass_seconds = time.perf_counter() - start
+        print(f"First pass complete. Pose found in {int(self.landmark_store.detected.sum())}/{self.landmark_store.frame_count} frames "
+              f"({self.inference_calls} inference calls).")
+
+    @property
+    def _frame_profiler(self):
+        # None keeps read_frames on its untimed path when instrumentation is off.
+        return self.profiler if self.profiler.enabled else None
+
+    @property
+    def _decode_rgb(self):
+        # With a crop/downscale the color conversion happens on the smaller inference image instead.
+        return not self.inference_region.enabled
+
+    def _report_progress(self, stage, frames_done, frame_count=None):
+        if self.progress_callback is not None:
+            self.progress_callback(stage, frames_done, self.frame_count if frame_count is None else frame_count)
+
+    def _infer(self, item):
+        frame_idx, image = item
+        self.pose_frames += 1
+        if self.inference_region.enabled:
+            landmarks, calls = self.inference_region.process(self.pose, image)
+            self.inference_calls += calls
+        else:
             results = self.pose.process(image)
-            if results.pose_landmarks:
-                landmarks = results.pose_landmarks.landmark
-                frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                current_metrics = self._calculate_metrics(landmarks, frame_width, frame_height)
-                if current_metrics:
-                    for key, value in current_metrics.items():
-                        self.metrics_over_time[key].append(value)
-        cap.release()
-        print("First pass complete.")
+            self.inference_calls += 1
+            landmarks = landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+        self.detections += landmarks is not None
+        return frame_idx, landmarks
+
+    def _run_inference(self, frames, label, first_stored_frame=0):
+        """Runs pose over (frame_index, rgb_frame) items into the landmark store via the threaded pipeline."""
+        def store(item):
+            # Frames before first_stored_frame only warm up the tracker.
+            if item[0] >= first_stored_frame:
+                self.landmark_store.set(*item)
+            self._report_progress("analysis", item[0] + 1)
+
+        # Decode + color conversion and the store writes overlap with inference in separate threads.
+        pipeline = ThreadedPipeline(frames, self.profiler.wrap("pose", self._infer), store, self.queue_size, name=label)
+        self.pipeline_stats[label] = pipeline.run()
+        print_pipeline_stats(label.capitalize(), self.pipeline_stats[label])
+
+    def _update_metrics(self):
+        metrics, valid = compute_metrics_batch(self.landmark_store.landmarks, self.landmark_store.detected, self.frame_width, self.frame_height)
+        self.metrics_over_time = MetricsStore(len(valid))
+        self.metrics_over_time.assign(metrics, valid, self.landmark_store.interpolated)
+
+    def _extract_adaptive(self, cap, frame_count):
+        """
+        Runs pose on every k-th frame, interpolates the frames in between, then re-runs
+        pose densely from just before the backswing peak to just after impact.
+        """
+        stride = max(int(self.adaptive_stride), 1)
+        self.landmark_store = LandmarkStore(frame_count)
+        self._run_inference(read_frames(cap, convert_to_rgb=self._decode_rgb, stride=stride, profiler=self._frame_profiler), "coarse")
+        sampled_frames = np.arange(0, self.landmark_store.frame_count, stride)
+        # Frames grabbed after the last sample still belong to the video, just without landmarks.
+        total_frames = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        if total_frames > self.landmark_store.frame_count:
+            self.landmark_store.set(total_frames - 1, None)
+        filled = interpolate_landmarks(self.landmark_store, sampled_frames, stride)
+        print(f"Adaptive pass: sampled every {stride} frames, interpolated {filled} frames.")
+
+        self._update_metrics()
+        bonus_analyzer = BonusAnalyzer(self.metrics_over_time, self.output_dir, self.config)
+        impact_frame = bonus_analyzer.find_impact_moment()
+        if impact_frame is None:
+            print("Adaptive pass: no impact candidate found, keeping the sampled result.")
+            return
+        backswing_frame = bonus_analyzer.find_backswing_peak(impact_frame)
+        start, stop = refinement_window(backswing_frame, impact_frame, self.refine_margin_frames, self.landmark_store.frame_count)
+        print(f"Adaptive pass: refining frames {start}-{stop - 1} around impact.")
+        warmup_start = max(0, start - self.refine_warmup_frames)
+        # Drop the tracking/smoothing state left over from the end of the coarse pass.
+        self.pose.reset()
+        self.inference_region.reset()
+        self._run_inference(read_frames(cap, convert_to_rgb=self._decode_rgb, start=warmup_start, stop=stop, profiler=self._frame_profiler),
+                            "refine", first_stored_frame=start)
 
     def generate_outputs(self, run_bonus_features=False):
         """Second pass to generate all outputs after data is gathered."""
         print("Starting second pass: Generating outputs...")
-        if not self.metrics_over_time['front_elbow_angle']:
+        if self.metrics_over_time.valid_count == 0:
             print("No data collected, cannot generate report.")
             return {}
 
+        results = self.generate_reports(run_bonus_features)
+        results.update(self._write_output_video())
+        results["pipeline_stats"] = self.pipeline_stats
+        results["inference_calls"] = self.inference_calls
+        self.record_timings(results)
+        return results
+
+    def record_timings(self, results):
+        """Adds the run's stage timings to `results` and writes them to timings.json (if instrumentation is on)."""
+        if not self.profiler.enabled:
+            return results
+        report = self.profiler.report(self.landmark_store.frame_count, self.pose_frames, self.detections,
+                                      self.first_pass_seconds)
+        results["timings"] = report
+        results["timings_path"] = self.profiler.publish(report, self.output_dir)
+        print(f"Timings: {report['wall_seconds']:.2f}s wall, {report['analysis_fps']} fps analysis, "
+              f"pose found in {report['detection_rate']:.0%} of frames; details in {results['timings_path']}")
+        return results
+
+    def generate_reports(self, run_bonus_features=False):
+        """Scores the gathered metrics and writes evaluation.json (plus chart and HTML report with bonus features)."""
         impact_frame, evaluation, chart_path, html_report_path = None, {}, "", ""
         
         if run_bonus_features:
@@ -178,72 +289,196 @@ class PoseAnalyzer:
             # Pass self.config to the BonusAnalyzer
             bonus_analyzer = BonusAnalyzer(self.metrics_over_time, self.output_dir, self.config)
             # --- END FIX ---
-            impact_frame = bonus_analyzer.find_impact_moment()
-            self.phases_per_frame = bonus_analyzer.segment_shot_phases(impact_frame)
-            evaluation = self._generate_final_evaluation(impact_frame)
-            evaluation = bonus_analyzer.add_skill_grade_to_evaluation(evaluation)
-            evaluation = bonus_analyzer.add_reference_comparison(evaluation, impact_frame)
-            bonus_analyzer.export_temporal_chart(impact_frame)
+            with self.profiler.stage("bonus_analytics"):
+                impact_frame = bonus_analyzer.find_impact_moment()
+                self.impact_frame = impact_frame
+                self.phases_per_frame = bonus_analyzer.segment_shot_phases(impact_frame)
+                evaluation = self._generate_final_evaluation(impact_frame)
+                evaluation = bonus_analyzer.add_skill_grade_to_evaluation(evaluation)
+                evaluation = bonus_analyzer.add_reference_comparison(evaluation, impact_frame)
+            with self.profiler.stage("reference_match"):
+                evaluation = bonus_analyzer.add_trajectory_match(evaluation, self.phases_per_frame)
+            with self.profiler.stage("chart"):
+                bonus_analyzer.export_temporal_chart(impact_frame)
             chart_path = os.path.join(self.output_dir, 'elbow_angle_chart.png')
-            html_report_path = bonus_analyzer.export_html_report(evaluation, chart_path)
+            with self.profiler.stage("html_report"):
+                html_report_path = bonus_analyzer.export_html_report(evaluation, chart_path)
         else:
-            evaluation = self._generate_final_evaluation()
+            with self.profiler.stage("scoring"):
+                evaluation = self._generate_final_evaluation()
 
         report_path = os.path.join(self.output_dir, 'evaluation.json')
         with open(report_path, 'w') as f:
             json.dump(evaluation, f, indent=4)
 
-        self._write_annotated_video()
-
         return {
             "video_path": os.path.join(self.output_dir, 'annotated_video.mp4'),
             "report_path": report_path,
             "chart_path": chart_path,
             "evaluation_data": evaluation,
-            "html_report_path": html_report_path
+            "html_report_path": html_report_path,
+            "artifact_path": self.artifact_path
         }
 
-    def _write_annotated_video(self):
-        """Writes the annotated video file using pre-calculated data."""
+    def _output_settings(self):
+        """The selected output profile from config.json, with defaults filled in."""
+        # Configs written before output profiles existed (or a thresholds-only rescore config) get the built-in ones.
+        profiles = dict(DEFAULT_CONFIG['output']['profiles'], **self.config.get('output', {}).get('profiles', {}))
+        if self.output_profile not in profiles:
+            raise ValueError(f"Unknown output profile {self.output_profile!r}; expected one of {sorted(profiles)}")
+        return dict(DEFAULT_OUTPUT_PROFILE, **profiles[self.output_profile])
+
+    def _write_output_video(self):
+        """Writes the annotated video the output profile asks for and reports what it cost."""
+        settings = self._output_settings()
+        start = time.perf_counter()
+        video_path, frames_written = "", 0
+        if settings['video']:
+            first_frame, stop_frame = 0, None
+            if settings['frames'] == "impact":
+                if self.impact_frame is None:
+                    self.impact_frame = BonusAnalyzer(self.metrics_over_time, self.output_dir, self.config).find_impact_moment()
+                if self.impact_frame is not None:
+                    fps = self.fps or 30.0
+                    first_frame = max(self.impact_frame - int(settings['pre_impact_seconds'] * fps), 0)
+                    stop_frame = self.impact_frame + int(settings['post_impact_seconds'] * fps) + 1
+            filename = 'highlight_video.mp4' if settings['frames'] == "impact" else 'annotated_video.mp4'
+            with self.profiler.stage("output_video"):
+                video_path, frames_written = self._write_annotated_video(first_frame, stop_frame, settings['scale'],
+                                                                         settings['codec'], filename)
+        seconds = time.perf_counter() - start
+        output_stats = {
+            'profile': self.output_profile,
+            'codec': settings['codec'] if video_path else None,
+            'scale': settings['scale'] if video_path else None,
+            'frames_written': frames_written,
+            'seconds': round(seconds, 3),
+            'bytes': os.path.getsize(video_path) if video_path else 0,
+        }
+        print(f"Output profile '{self.output_profile}': {frames_written} frames, {output_stats['bytes'] / 1e6:.2f} MB in {seconds:.2f}s")
+        return {"video_path": video_path, "output_stats": output_stats}
+
+    def _write_annotated_video(self, first_frame=0, stop_frame=None, scale=1.0, codec='mp4v', filename='annotated_video.mp4'):
+        """
+        Writes the annotated video file using pre-calculated data.
+
+        Only frames [first_frame, stop_frame) are written, shrunk by `scale` after the
+        overlays are drawn. Returns the video path and the number of frames written.
+        """
         print("Writing annotated video...")
         cap = cv2.VideoCapture(self.input_video_path)
         frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         fps = int(cap.get(cv2.CAP_PROP_FPS))
-        output_video_path = os.path.join(self.output_dir, 'annotated_video.mp4')
-        out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (frame_width, frame_height))
+        size = (frame_width, frame_height)
+        if scale != 1.0:
+            # Encoders want even dimensions.
+            size = (max(int(frame_width * scale) // 2 * 2, 2), max(int(frame_height * scale) // 2 * 2, 2))
+        # INTER_AREA keeps the overlay text legible and is cheap for whole-number factors only.
+        interpolation = cv2.INTER_AREA if scale < 1.0 and (1.0 / scale).is_integer() else cv2.INTER_LINEAR
+        output_video_path = os.path.join(self.output_dir, filename)
+        out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*codec), fps, size)
+        if not out.isOpened() and codec != 'mp4v':
+            print(f"Codec {codec!r} is not available in this OpenCV build; falling back to mp4v.")
+            out = cv2.VideoWriter(output_video_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+        last_frame = self.frame_count if stop_frame is None else min(stop_frame, self.frame_count or stop_frame)
+        frames_to_write = max(last_frame - first_frame, 0)
         
-        frame_idx = 0
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret: break
-            
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.pose.process(image)
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
+        def annotate(item):
+            frame_idx, frame = item
             current_phase = self.phases_per_frame[frame_idx] if frame_idx < len(self.phases_per_frame) else ""
-            
-            if results.pose_landmarks and frame_idx < len(self.metrics_over_time['front_elbow_angle']):
-                metrics = {k: v[frame_idx] for k, v in self.metrics_over_time.items() if len(v) > frame_idx}
+
+            metrics = self.metrics_over_time.row(frame_idx)
+            self._report_progress("render", frame_idx - first_frame + 1, frames_to_write)
+            if metrics is not None and self.landmark_store.get(frame_idx) is not None:
                 feedback = self._generate_feedback(metrics)
-                annotated_frame = self._draw_overlays(image, metrics, feedback, results.pose_landmarks, current_phase)
-                out.write(annotated_frame)
-            else:
-                out.write(frame)
-            frame_idx += 1
+                frame = self._draw_overlays(frame, metrics, feedback, frame_idx, current_phase)
+            if size != (frame_width, frame_height):
+                frame = cv2.resize(frame, size, interpolation=interpolation)
+            return frame
+
+        # Decoding and encoding run in their own threads while overlays are drawn.
+        pipeline = ThreadedPipeline(read_frames(cap, start=first_frame, stop=stop_frame, profiler=self._frame_profiler,
+                                                decode_stage="render_decode"),
+                                    self.profiler.wrap("overlays", annotate), self.profiler.wrap("encode", out.write),
+                                    self.queue_size, name="render")
+        self.pipeline_stats['render'] = pipeline.run()
         
         cap.release()
         out.release()
-        self.pose.close()
+        print_pipeline_stats("Render", self.pipeline_stats['render'])
         print("Annotated video saved.")
+        return output_video_path, self.pipeline_stats['render']['stages']['encode']['items']
 
-def analyze_video(video_path, run_bonus_features=False):
+def analyze_video(video_path, run_bonus_features=False, workers=None, cache=None, mode=None, progress_callback=None,
+                  output_profile=None, metrics_sink=None, video_info=None):
     """
     High-level function to run the full analysis pipeline on a video.
     This function is called by the Streamlit app.
+    Pass workers > 1 to run pose extraction in parallel across processes, a
+    ResultCache to return earlier results for an identical video and config, and
+    mode="adaptive" to sample frames and only run dense inference around impact.
+    `progress_callback(stage, frames_done, frame_count)` is called as the
+    "analysis" and "render" passes work through the video. `output_profile` picks
+    one of config.json's output profiles (e.g. "preview", "highlight" or
+    "metrics_only") instead of the configured default. Stage timings are returned
+    under "timings", written to timings.json and passed to `metrics_sink(report)`.
+    Pass `video_info` (from pipeline.probe_video) when the caller has already probed the video.
     """
-    analyzer = PoseAnalyzer(input_video_path=video_path)
+    config = load_config()
+    if output_profile is not None:
+        # Folded into the config so cached results are keyed by the profile too.
+        config = thaw(config)
+        config['output'] = dict(config.get('output', {}), profile=output_profile)
+        config = freeze(config)
+    if mode is not None:
+        # Likewise the sampling mode: adaptive results are approximate and must not answer a full-rate request.
+        config = thaw(config)
+        config['processing'] = dict(config.get('processing', {}), mode=mode)
+        config = freeze(config)
+    cache_key = None
+    if cache is not None:
+        library_path = config.get('reference_library', {}).get('path', "")
+        if run_bonus_features and library_fingerprint(library_path):
+            # A rebuilt reference library changes the "Reference Match" result, so it is part of the key.
+            config = thaw(config)
+            config['reference_library']['fingerprint'] = library_fingerprint(library_path)
+            config = freeze(config)
+        cache_key = cache.make_key(video_path, config, run_bonus_features)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            print(f"Cache hit: reusing results from {os.path.dirname(cached['report_path'])}")
+            cached["cache_hit"] = True
+            return cached
+
+    analyzer = PoseAnalyzer(input_video_path=video_path, workers=workers, config=config, mode=mode,
+                            progress_callback=progress_callback, output_profile=output_profile, metrics_sink=metrics_sink, video_info=video_info)
     analyzer.process_video_first_pass()
     results = analyzer.generate_outputs(run_bonus_features)
+    if cache is not None and results:
+        cache.put(cache_key, results, analyzer.output_dir)
+    if results:
+        results["cache_hit"] = False
     return results
+
+def rescore(artifact_path, config=None, run_bonus_features=True):
+    """
+    Regenerates evaluation.json, the chart and the HTML report from a saved analysis
+    artifact (or the analysis directory holding one) without touching the video.
+    Pass a config dict to re-grade with new thresholds; it is merged over config.json,
+    so it only needs the sections it changes.
+    """
+    if config is not None:
+        config = merge_config(load_config(), config)
+    artifact = load_artifact(artifact_path)
+    analyzer = PoseAnalyzer(input_video_path=artifact['video_path'], config=config,
+                            run_dir=os.path.dirname(artifact['path']))
+    analyzer.landmark_store = artifact['landmark_store']
+    analyzer.metrics_over_time = artifact['metrics']
+    analyzer.fps = artifact['fps']
+    analyzer.frame_width, analyzer.frame_height = artifact['frame_width'], artifact['frame_height']
+    analyzer.artifact_path = artifact['path']
+    if analyzer.metrics_over_time.valid_count == 0:
+        print("No data in artifact, cannot generate report.")
+        return {}
+    return analyzer.generate_reports(run_bonus_features)
@@ -1,11 +1,139 @@
 import streamlit as st
+import functools
 import os
 import tempfile
-import cv2  # For getting video resolution
-from analysis_module import analyze_video  # Import the refactored analysis function
+import time
+from jobs import JobScheduler, QueueFullError
+from pipeline import probe_video
+from settings import load_config
+from result_cache import ResultCache
 
 st.set_page_config(page_title="Cricket Shot Analyzer", layout="wide")
 
+# Uploads are written to disk in chunks of this size.
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+@st.cache_resource
+def get_result_cache():
+    """One result cache per server process, shared by every session."""
+    max_bytes = load_config().get('cache', {}).get('max_bytes', 2 * 1024 ** 3)
+    return ResultCache('output', max_bytes=max_bytes)
+
+
+@st.cache_resource
+def get_scheduler():
+    """One background job scheduler per server process: a fixed number of analyses run at once."""
+    return JobScheduler.from_config(load_config(), cache=get_result_cache())
+
+
+def spool_upload(uploaded_file, file):
+    """Copies an upload into an open file chunk by chunk, without making a second in-memory copy of it."""
+    # Uploads are BytesIO objects: getbuffer() is a view of their bytes, and slices of it copy nothing.
+    with uploaded_file.getbuffer() as view:
+        for start in range(0, len(view), UPLOAD_CHUNK_BYTES):
+            file.write(view[start:start + UPLOAD_CHUNK_BYTES])
+
+
+def read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def spool_to_temp(uploaded_file):
+    """Writes an upload to a new temp file and returns its path."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tfile:
+        spool_upload(uploaded_file, tfile)
+    return tfile.name
+
+
+def discard_upload():
+    """Forgets the session's upload and deletes its temp copy, unless a job has already taken it over."""
+    saved = st.session_state.pop('upload', None)
+    if saved and saved[1] and os.path.exists(saved[1]):
+        os.remove(saved[1])
+
+
+def probe_upload(uploaded_file):
+    """
+    Writes a new upload to a temp file once (not on every rerun), probes its header and
+    returns the metadata, which is reused for display and by the analyzer. The temp file
+    is kept in the session for the analysis job, and a replaced upload's file is deleted.
+    """
+    upload_id = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    saved = st.session_state.get('upload')
+    if saved and saved[0] == upload_id:
+        return saved[2]
+    discard_upload()
+    path = spool_to_temp(uploaded_file)
+    try:
+        video_info = probe_video(path)
+    except Exception:
+        os.remove(path)
+        raise
+    st.session_state['upload'] = (upload_id, path, video_info)
+    st.session_state.pop('job_id', None)
+    return video_info
+
+
+def show_results(results, run_bonus):
+    st.success("Analysis Complete!")
+    if results.get('cache_hit'):
+        cache_stats = get_result_cache().stats
+        st.caption(f"Loaded from cache (hits: {cache_stats['hits']}, misses: {cache_stats['misses']})")
+
+    # --- Results ---
+    st.header("Results")
+
+    if run_bonus and os.path.exists(results.get('html_report_path', '')):
+        st.subheader("Analysis Report")
+        with open(results['html_report_path'], 'r', encoding='utf-8') as f:
+            st.components.v1.html(f.read(), height=600, scrolling=True)
+        # A callable is only run when the button is clicked, so the file is not held in memory until then.
+        st.download_button(
+            label="Download HTML Report",
+            data=functools.partial(read_file, results['html_report_path']),
+            file_name="analysis_report.html",
+            mime="text/html"
+        )
+    else:
+        st.subheader("Evaluation Report")
+        if results.get('evaluation_data'):
+            # Copy: the job's results are shown again on every rerun.
+            eval_data = dict(results['evaluation_data'])
+            if 'Overall Grade' in eval_data:
+                grade_info = eval_data.pop('Overall Grade')
+                st.metric(
+                    label="Overall Grade",
+                    value=grade_info['grade'],
+                    delta=f"Avg Score: {grade_info['average_score']}"
+                )
+            for category, details in eval_data.items():
+                st.metric(label=category, value=f"{details['score']}/10")
+                st.caption(details['feedback'])
+
+    if not results.get('video_path'):
+        # The "metrics_only" output profile writes no video.
+        return
+    st.subheader("Annotated Video")
+    if os.path.exists(results['video_path']):
+        show_video(results['video_path'])
+    else:
+        st.error("Could not find the annotated video file.")
+
+
+def show_video(video_path):
+    """Plays the annotated video and offers it for download, serving both from the file."""
+    # Given a path, Streamlit loads the file into its media store once and serves it from there.
+    st.video(video_path)
+    st.download_button(
+        label="Download Annotated Video",
+        data=functools.partial(read_file, video_path),
+        file_name="annotated_video.mp4",
+        mime="video/mp4"
+    )
+
+
 st.title("🏏 AI-Powered Cricket Cover Drive Analysis")
 st.write("Upload a video of a cover drive to get a detailed biomechanical analysis, frame-by-frame overlays, and a final performance score.")
 
@@ -13,72 +141,44 @@ st.write("Upload a video of a cover drive to get a detailed biomechanical analys
 uploaded_file = st.file_uploader("Choose a video file...", type=["mp4", "mov", "avi"])
 run_bonus = st.checkbox("Enable Advanced Bonus Analysis (Slower)", value=True)
 
-if uploaded_file is not None:
-    # Save uploaded file as a temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tfile:
-        tfile.write(uploaded_file.read())
-        video_path = tfile.name
-
-    # --- Get video resolution dynamically ---
-    cap = cv2.VideoCapture(video_path)
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    cap.release()
+if uploaded_file is None:
+    discard_upload()
+    st.session_state.pop('job_id', None)
+else:
+    video_info = probe_upload(uploaded_file)
 
-    st.write(f"**Video Resolution:** {width} × {height}")
-    st.video(video_path)  # Streamlit auto-preserves aspect ratio
+    st.write(f"**Video Resolution:** {video_info['width']} × {video_info['height']}")
+    st.video(uploaded_file)  # Streamlit auto-preserves aspect ratio
 
+    scheduler = get_scheduler()
     if st.button("Analyze Shot", type="primary"):
-        with st.spinner("Analyzing video... This may take a few moments. Please wait."):
-            try:
-                # Run analysis
-                results = analyze_video(video_path, run_bonus_features=run_bonus)
-                st.success("Analysis Complete!")
-
-                # --- Results ---
-                st.header("Results")
-
-                if run_bonus and os.path.exists(results.get('html_report_path', '')):
-                    st.subheader("Analysis Report")
-                    with open(results['html_report_path'], 'r', encoding='utf-8') as f:
-                        st.components.v1.html(f.read(), height=600, scrolling=True)
-                    with open(results['html_report_path'], "rb") as file:
-                        st.download_button(
-                            label="Download HTML Report",
-                            data=file,
-                            file_name="analysis_report.html",
-                            mime="text/html"
-                        )
-                else:
-                    st.subheader("Evaluation Report")
-                    if results.get('evaluation_data'):
-                        eval_data = results['evaluation_data']
-                        if 'Overall Grade' in eval_data:
-                            grade_info = eval_data.pop('Overall Grade')
-                            st.metric(
-                                label="Overall Grade",
-                                value=grade_info['grade'],
-                                delta=f"Avg Score: {grade_info['average_score']}"
-                            )
-                        for category, details in eval_data.items():
-                            st.metric(label=category, value=f"{details['score']}/10")
-                            st.caption(details['feedback'])
-
-                st.subheader("Annotated Video")
-                if os.path.exists(results['video_path']):
-                    with open(results['video_path'], 'rb') as file:
-                        st.video(file.read())  # Dynamic display
-                        st.download_button(
-                            label="Download Annotated Video",
-                            data=file,
-                            file_name="annotated_video.mp4",
-                            mime="video/mp4"
-                        )
-                else:
-                    st.error("Could not find the annotated video file.")
-
-            except Exception as e:
-                st.error(f"An error occurred during analysis: {e}")
-            finally:
-                if os.path.exists(video_path):
-                    os.remove(video_path)
+        upload_id, video_path, _ = st.session_state['upload']
+        if video_path is None:
+            # An earlier job took this upload's file; analyzing it again needs a new copy.
+            video_path = spool_to_temp(uploaded_file)
+        try:
+            st.session_state['job_id'] = scheduler.submit(video_path, run_bonus_features=run_bonus, video_info=video_info,
+                                                          delete_input=True).id
+            # The job now owns the file and deletes it when it finishes, whether or not the session is still open.
+            video_path = None
+        except QueueFullError:
+            load = scheduler.load()
+            st.warning(f"The analyzer is busy ({load['running']} running, {load['queued']} waiting). Please try again in a minute.")
+        st.session_state['upload'] = (upload_id, video_path, video_info)
+
+    job_id = st.session_state.get('job_id')
+    status = scheduler.status(job_id) if job_id else None
+    if status is not None:
+        if status['state'] == "queued":
+            st.info(f"Waiting for a free analyzer... position {status['position']} in the queue.")
+        elif status['state'] == "running":
+            stage = "Drawing overlays" if status['stage'] == "render" else "Analyzing video"
+            st.progress(status['progress'], text=f"{stage}... {int(status['progress'] * 100)}%")
+        elif status['state'] == "failed":
+            st.error(f"An error occurred during analysis: {status['error']}")
+        else:
+            show_results(status['results'], status['run_bonus_features'])
+        if status['state'] in ("queued", "running"):
+            # Poll instead of blocking this script run on the analysis.
+            time.sleep(load_config().get('jobs', {}).get('poll_seconds', 1.0))
+            st.rerun()
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+
+from landmark_store import LandmarkStore
+from metrics_store import MetricsStore, METRIC_NAMES
+
+ARTIFACT_FILENAME = 'analysis_artifact.npz'
+ARTIFACT_VERSION = 1
+
+
+def save_artifact(output_dir, landmark_store, metrics_store, fps, frame_width, frame_height, video_path=""):
+    """
+    Writes the raw landmarks and derived metrics of an analysis run to a compact .npz file.
+
+    Everything needed to regenerate the evaluation, chart and HTML report is in the
+    artifact, so re-scoring never has to decode the video or run pose again.
+    """
+    path = os.path.join(output_dir, ARTIFACT_FILENAME)
+    columns = {f"metric_{name}": metrics_store[name] for name in metrics_store.names}
+    np.savez_compressed(
+        path,
+        version=ARTIFACT_VERSION,
+        landmarks=landmark_store.landmarks,
+        detected=landmark_store.detected,
+        valid=metrics_store.valid,
+        interpolated=landmark_store.interpolated,
+        fps=float(fps),
+        frame_width=int(frame_width),
+        frame_height=int(frame_height),
+        video_path=str(video_path),
+        **columns
+    )
+    return path
+
+
+def load_artifact(path):
+    """Loads an artifact written by save_artifact back into a LandmarkStore and a MetricsStore."""
+    if os.path.isdir(path):
+        path = os.path.join(path, ARTIFACT_FILENAME)
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data['version'])
+        if version != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {version} in {path}")
+        detected = data['detected']
+        # Artifacts written before adaptive mode existed have no interpolated frames.
+        interpolated = data['interpolated'] if 'interpolated' in data.files else np.zeros(len(detected), dtype=bool)
+        landmark_store = LandmarkStore(len(detected))
+        landmark_store.set_range(0, data['landmarks'], detected, interpolated)
+        valid = data['valid']
+        metrics_store = MetricsStore(len(valid))
+        metrics_store.assign({name: data[f"metric_{name}"] for name in METRIC_NAMES}, valid, interpolated)
+        return {
+            'path': path,
+            'landmark_store': landmark_store,
+            'metrics': metrics_store,
+            'fps': float(data['fps']),
+            'frame_width': int(data['frame_width']),
+            'frame_height': int(data['frame_height']),
+            'video_path': str(data['video_path']),
+        }
@@ -0,0 +1,199 @@
+"""
+Headless batch analysis of many clips across worker processes.
+
+Usage (from the repository root):
+    python batch.py clips/ --output output/batch --workers 4 --bonus
+    python batch.py manifest.txt --skip-video
+
+INPUT is a folder (searched recursively for videos) or a manifest file listing one
+clip per line (relative paths are resolved against the manifest's folder; lines
+starting with # are ignored). Each clip gets its own job folder named after the
+clip plus a hash of its path, and a job counts as done once its result.json is
+written with the same options (--bonus, --mode, --profile, --skip-video), so
+re-running the same command skips finished clips. An aggregate
+summary.json with per-video scores, wall time and fps is written at the end.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import as_completed
+
+VIDEO_EXTENSIONS = ('.mp4', '.mov', '.avi', '.mkv', '.m4v')
+RESULT_FILENAME = 'result.json'
+SUMMARY_FILENAME = 'summary.json'
+
+
+def find_clips(source):
+    """Lists the clips in a folder (recursively) or in a manifest file, as unique absolute paths in order."""
+    if os.path.isdir(source):
+        clips = []
+        for root, _, files in os.walk(source):
+            clips.extend(os.path.join(root, name) for name in files if name.lower().endswith(VIDEO_EXTENSIONS))
+        return sorted(os.path.abspath(clip) for clip in clips)
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r') as f:
+        lines = [line.strip() for line in f]
+    clips = [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith('#')]
+    # Lines naming the same file would share a job folder and run as two jobs writing the same outputs.
+    return list(dict.fromkeys(clips))
+
+
+def job_id(video_path):
+    """A stable, collision-free folder name for a clip: its name plus a hash of its full path."""
+    stem = re.sub(r'[^A-Za-z0-9_.-]+', '_', os.path.splitext(os.path.basename(video_path))[0])
+    return f"{stem}_{hashlib.sha1(video_path.encode()).hexdigest()[:10]}"
+
+
+def _write_json(path, data):
+    # Write-then-rename so an interrupted job never leaves a half-written (and "completed") result.
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(temp_path, path)
+
+
+def _init_worker():
+    import cv2
+    # One process per core already; keep OpenCV from oversubscribing with its own thread pool.
+    cv2.setNumThreads(1)
+
+
+def job_options(run_bonus_features=False, mode=None, skip_video=False, output_profile=None):
+    """The options a job's outputs depend on, as stored in its result.json."""
+    return {'run_bonus_features': bool(run_bonus_features), 'mode': mode, 'skip_video': bool(skip_video),
+            'output_profile': output_profile}
+
+
+def run_job(video_path, job_dir, run_bonus_features=False, mode=None, skip_video=False, output_profile=None):
+    """Analyzes one clip into job_dir and writes its result.json. Runs inside a worker process."""
+    from analysis_module import PoseAnalyzer
+
+    start = time.perf_counter()
+    try:
+        analyzer = PoseAnalyzer(video_path, run_dir=job_dir, workers=1, mode=mode, output_profile=output_profile)
+        analyzer.process_video_first_pass()
+        if analyzer.landmark_store.frame_count == 0:
+            raise RuntimeError("could not read any frames")
+        if analyzer.metrics_over_time.valid_count == 0:
+            raise RuntimeError("no pose detected in any frame")
+        if skip_video:
+            outputs = analyzer.record_timings(analyzer.generate_reports(run_bonus_features))
+        else:
+            outputs = analyzer.generate_outputs(run_bonus_features)
+    except Exception as e:
+        return {'video': video_path, 'job_dir': job_dir, 'status': 'failed', 'error': f"{type(e).__name__}: {e}",
+                'wall_seconds': round(time.perf_counter() - start, 3)}
+    wall_seconds = time.perf_counter() - start
+    frames = int(analyzer.landmark_store.frame_count)
+    evaluation = outputs['evaluation_data']
+    result = {
+        'video': video_path,
+        'job_dir': job_dir,
+        'status': 'completed',
+        'scores': {category: float(details['score']) for category, details in evaluation.items() if 'score' in details},
+        'grade': evaluation.get('Overall Grade', {}).get('grade'),
+        'frames': frames,
+        'inference_calls': analyzer.inference_calls,
+        'wall_seconds': round(wall_seconds, 3),
+        'fps': round(frames / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        'report_path': outputs['report_path'],
+        'output_stats': outputs.get('output_stats'),
+        'options': job_options(run_bonus_features, mode, skip_video, output_profile),
+    }
+    _write_json(os.path.join(job_dir, RESULT_FILENAME), result)
+    return result
+
+
+def run_batch(clips, output_dir, workers=None, run_bonus_features=False, mode=None, skip_video=False, force=False,
+              output_profile=None):
+    """
+    Runs every clip through run_job on a process pool and writes summary.json.
+
+    Clips whose job folder already holds a result.json from the same options are
+    skipped (and reported with their earlier result) unless `force` is set; a
+    result from other options is re-run.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    options = job_options(run_bonus_features, mode, skip_video, output_profile)
+    results, pending = [], []
+    for clip in clips:
+        job_dir = os.path.join(output_dir, job_id(clip))
+        result_path = os.path.join(job_dir, RESULT_FILENAME)
+        if not force and os.path.exists(result_path):
+            with open(result_path, 'r') as f:
+                previous = json.load(f)
+            if previous.get('options') == options:
+                results.append(dict(previous, status='skipped'))
+                continue
+        os.makedirs(job_dir, exist_ok=True)
+        pending.append((clip, job_dir))
+    print(f"Batch: {len(clips)} clip(s), {len(results)} already done, {len(pending)} to run on {workers} worker(s).")
+
+    start = time.perf_counter()
+    if pending:
+        from parallel_pose import process_pool
+
+        with process_pool(min(workers, len(pending)), initializer=_init_worker) as executor:
+            futures = {executor.submit(run_job, clip, job_dir, run_bonus_features, mode, skip_video, output_profile): (clip, job_dir)
+                       for clip, job_dir in pending}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A worker that dies outright (e.g. a decoder crash) fails its job, not the batch.
+                    clip, job_dir = futures[future]
+                    result = {'video': clip, 'job_dir': job_dir, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+                results.append(result)
+                if result['status'] == 'completed':
+                    print(f"  done   {os.path.basename(result['video'])}: {result['wall_seconds']:.1f}s, {result['fps']} fps, scores {result['scores']}")
+                else:
+                    print(f"  failed {os.path.basename(result['video'])}: {result['error']}")
+    wall_seconds = time.perf_counter() - start
+
+    ran = [result for result in results if result['status'] == 'completed']
+    frames = sum(result['frames'] for result in ran)
+    summary = {
+        'output_dir': os.path.abspath(output_dir),
+        'workers': workers,
+        'totals': {
+            'clips': len(clips),
+            'completed': len(ran),
+            'skipped': sum(result['status'] == 'skipped' for result in results),
+            'failed': sum(result['status'] == 'failed' for result in results),
+            'frames': frames,
+            'wall_seconds': round(wall_seconds, 3),
+            # Throughput of this run across all workers (skipped jobs excluded).
+            'fps': round(frames / wall_seconds, 2) if ran and wall_seconds > 0 else 0.0,
+        },
+        'jobs': sorted(results, key=lambda result: result['video']),
+    }
+    _write_json(os.path.join(output_dir, SUMMARY_FILENAME), summary)
+    print(f"Batch complete in {wall_seconds:.1f}s: {summary['totals']}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="folder of clips or manifest file")
+    parser.add_argument('--output', default=os.path.join('output', 'batch'))
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--bonus', action='store_true', help="also run the bonus analytics (grade, chart, HTML report)")
+    parser.add_argument('--mode', choices=('full', 'adaptive'), default=None)
+    parser.add_argument('--skip-video', action='store_true', help="write reports only, no annotated video")
+    parser.add_argument('--profile', default=None, help="output profile from config.json (e.g. preview, highlight)")
+    parser.add_argument('--force', action='store_true', help="re-run clips that already have a result")
+    args = parser.parse_args()
+
+    clips = find_clips(args.input)
+    if not clips:
+        parser.error(f"no clips found in {args.input}")
+    summary = run_batch(clips, args.output, args.workers, args.bonus, args.mode, args.skip_video, args.force, args.profile)
+    if summary['totals']['failed']:
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark: full-rate vs. adaptive-stride analysis.
+
+Reports inference calls, wall time and the per-category score difference
+against full-rate analysis. Run from the repository root:
+    python -m benchmarks.bench_adaptive --video input_video.mp4 --strides 2 4 8
+"""
+import argparse
+import tempfile
+import time
+
+from analysis_module import PoseAnalyzer
+
+
+def analyze(video_path, mode, stride=None):
+    with tempfile.TemporaryDirectory() as run_dir:
+        analyzer = PoseAnalyzer(video_path, run_dir=run_dir, mode=mode)
+        if stride is not None:
+            analyzer.adaptive_stride = stride
+        start = time.perf_counter()
+        analyzer.process_video_first_pass()
+        elapsed = time.perf_counter() - start
+        evaluation = analyzer.generate_reports(run_bonus_features=True)['evaluation_data']
+    scores = {category: float(details['score']) for category, details in evaluation.items() if 'score' in details}
+    return scores, analyzer.inference_calls, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--strides', type=int, nargs='+', default=[2, 4, 8])
+    args = parser.parse_args()
+
+    reference, reference_calls, reference_time = analyze(args.video, 'full')
+    print(f"full: {reference_calls} inference calls, first pass {reference_time:.2f}s, scores {reference}")
+    for stride in args.strides:
+        scores, calls, elapsed = analyze(args.video, 'adaptive', stride)
+        diffs = {category: round(abs(scores[category] - reference[category]), 2) for category in reference}
+        print(f"stride {stride}: {calls} inference calls ({reference_calls / calls:.1f}x fewer), "
+              f"first pass {elapsed:.2f}s, |score diff| {diffs}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: memory the Streamlit app allocates per session to take an upload and serve its results.
+
+Runs the app's upload and result-serving code under Streamlit's AppTest runtime
+(with its in-memory media store) and reports the Python heap peak of each step
+with tracemalloc, for a synthetic upload of --size-mb and the annotated video
+of --video. The previous code is kept here for comparison. Run from the repository root:
+    python -m benchmarks.bench_app_memory --size-mb 50 200 --video output/<run>/annotated_video.mp4
+"""
+import argparse
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from pipeline import probe_video
+
+
+def scenario(mode, upload_bytes, video_path):
+    import io
+    import os
+    import tempfile
+    import tracemalloc
+
+    import streamlit as st
+
+    def peak_of(step):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        step()
+        return tracemalloc.get_traced_memory()[1] - before
+
+    upload = io.BytesIO(os.urandom(upload_bytes))  # what st.file_uploader hands the script
+    tracemalloc.start()
+    peaks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'upload.mp4'), 'wb') as f:
+            if mode == "new":
+                from app import spool_upload
+                peaks['save_upload'] = peak_of(lambda: spool_upload(upload, f))
+            else:
+                peaks['save_upload'] = peak_of(lambda: f.write(upload.read()))
+
+        def serve():
+            if mode == "new":
+                from app import show_video
+                show_video(video_path)
+                return
+            with open(video_path, 'rb') as file:
+                st.video(file.read())
+                # Streamlit rewinds the file and reads it again for the download.
+                st.download_button("Download", data=file, file_name="annotated_video.mp4")
+
+        peaks['serve_video'] = peak_of(serve)
+    tracemalloc.stop()
+    st.session_state['peaks'] = peaks
+
+
+def run(mode, upload_bytes, video_path):
+    app = AppTest.from_function(scenario, args=(mode, upload_bytes, os.path.abspath(video_path)), default_timeout=120)
+    app.run()
+    if app.exception:
+        raise SystemExit(app.exception[0].message)
+    return app.session_state['peaks']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, nargs='+', default=[50, 200])
+    parser.add_argument('--video', default='input_video.mp4', help="stands in for the annotated video served")
+    args = parser.parse_args()
+
+    video_mb = os.path.getsize(args.video) / 1e6
+    start = time.perf_counter()
+    probe_video(args.video)
+    # The previous app re-opened the upload for its resolution on every rerun (once a second while polling a job).
+    print(f"Opening the video for its resolution: {(time.perf_counter() - start) * 1000:.1f} ms per rerun (previous app)")
+    print(f"{'upload':>8} {'code':<9} {'save_upload':>12} {f'serve {video_mb:.1f} MB video':>22}")
+    for size_mb in args.size_mb:
+        for mode in ("previous", "new"):
+            peaks = run(mode, int(size_mb * 1e6), args.video)
+            print(f"{size_mb:>6.0f}MB {mode:<9} {peaks['save_upload'] / 1e6:>10.2f}MB {peaks['serve_video'] / 1e6:>20.2f}MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Micro-benchmark: per-frame `compute_frame_metrics` vs. `compute_metrics_batch`.
+
+Run from the repository root:
+    python -m benchmarks.bench_metrics_engine --frames 20000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.synthetic import synthetic_landmarks
+from metrics_engine import compute_frame_metrics, compute_metrics_batch
+from metrics_store import METRIC_NAMES
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+
+
+def run_per_frame(landmarks, detected):
+    # Mimic MediaPipe's landmark objects so the per-frame path runs exactly as in the first pass.
+    frames = [[SimpleNamespace(x=float(x), y=float(y)) for x, y in frame[:, :2]] for frame in landmarks]
+    start = time.perf_counter()
+    columns = {name: np.full(len(landmarks), np.nan) for name in METRIC_NAMES}
+    for i, frame in enumerate(frames):
+        if not detected[i]:
+            continue
+        metrics = compute_frame_metrics(frame, FRAME_WIDTH, FRAME_HEIGHT)
+        for name in METRIC_NAMES:
+            columns[name][i] = metrics[name]
+    return columns, time.perf_counter() - start
+
+
+def run_batch(landmarks, detected):
+    start = time.perf_counter()
+    columns, _ = compute_metrics_batch(landmarks, detected, FRAME_WIDTH, FRAME_HEIGHT)
+    return columns, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=20000)
+    args = parser.parse_args()
+
+    landmarks, detected = synthetic_landmarks(args.frames)
+    per_frame, per_frame_time = run_per_frame(landmarks, detected)
+    batch, batch_time = run_batch(landmarks, detected)
+
+    for name in METRIC_NAMES:
+        np.testing.assert_allclose(batch[name], per_frame[name], rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=name)
+
+    print(f"Frames: {args.frames}")
+    print(f"Per-frame path: {per_frame_time * 1000:.1f} ms ({args.frames / per_frame_time:,.0f} frames/s)")
+    print(f"Batch path:     {batch_time * 1000:.1f} ms ({args.frames / batch_time:,.0f} frames/s)")
+    print(f"Speedup: {per_frame_time / batch_time:.1f}x (results match)")
+
+
+if __name__ == '__main__':
+    main()
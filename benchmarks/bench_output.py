@@ -0,0 +1,43 @@
+"""
+Benchmark: cost of each output profile (annotated video written after analysis).
+
+Runs the first pass and scoring once, then writes the output of every profile
+in config.json and reports its wall time, frames written and file size, as
+returned under `output_stats`. Pass --upscale 3 to benchmark a higher-resolution
+copy of the clip. Run from the repository root:
+    python -m benchmarks.bench_output --video input_video.mp4 --upscale 1 3
+"""
+import argparse
+import os
+import tempfile
+
+from analysis_module import PoseAnalyzer
+from benchmarks.bench_roi import upscale_video
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--upscale', type=int, nargs='+', default=[1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for upscale in args.upscale:
+            video_path = args.video
+            if upscale != 1:
+                video_path = os.path.join(tmp, f'upscaled_{upscale}.mp4')
+                upscale_video(args.video, upscale, video_path)
+            analyzer = PoseAnalyzer(video_path, run_dir=os.path.join(tmp, f'run_{upscale}'), workers=1, mode='full')
+            analyzer.process_video_first_pass()
+            analyzer.generate_reports(run_bonus_features=True)
+            rows = []
+            for profile in analyzer.config['output']['profiles']:
+                analyzer.output_profile = profile
+                rows.append(analyzer._write_output_video()['output_stats'])
+            print(f"\n{analyzer.frame_width}x{analyzer.frame_height}, {analyzer.frame_count} frames:")
+            for stats in rows:
+                print(f"  {stats['profile']:<13} {stats['seconds']:6.2f}s  {stats['frames_written']:>4} frames  "
+                      f"{stats['bytes'] / 1e6:6.2f} MB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: serial vs. sharded multi-process pose extraction.
+
+Run from the repository root:
+    python -m benchmarks.bench_parallel_pose --video input_video.mp4 --workers 2 4 8
+"""
+import argparse
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from analysis_module import POSE_OPTIONS
+from landmark_store import LandmarkStore
+from parallel_pose import extract_landmarks_parallel
+
+
+def extract_serial(video_path):
+    cap = cv2.VideoCapture(video_path)
+    store = LandmarkStore(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    with mp.solutions.pose.Pose(**POSE_OPTIONS) as pose:
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret: break
+            results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            store.append(results.pose_landmarks.landmark if results.pose_landmarks else None)
+    cap.release()
+    return store
+
+
+def compare(reference, candidate):
+    """Detection agreement and mean landmark drift (normalized units) against the serial run."""
+    both = reference.detected & candidate.detected
+    agreement = np.mean(reference.detected == candidate.detected)
+    drift = np.abs(reference.landmarks[both, :, :2] - candidate.landmarks[both, :, :2]).mean() if both.any() else 0.0
+    return agreement, drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4])
+    parser.add_argument('--overlap', type=int, default=30)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    serial = extract_serial(args.video)
+    serial_time = time.perf_counter() - start
+    frame_count = serial.frame_count
+    print(f"{'mode':<12}{'seconds':>10}{'frames/s':>12}{'agreement':>12}{'drift':>10}")
+    print(f"{'serial':<12}{serial_time:>10.2f}{frame_count / serial_time:>12.1f}{1.0:>12.3f}{0.0:>10.4f}")
+
+    for workers in args.workers:
+        start = time.perf_counter()
+        sharded = extract_landmarks_parallel(args.video, frame_count, workers, POSE_OPTIONS, args.overlap)
+        elapsed = time.perf_counter() - start
+        agreement, drift = compare(serial, sharded)
+        print(f"{f'{workers} workers':<12}{elapsed:>10.2f}{frame_count / elapsed:>12.1f}{agreement:>12.3f}{drift:>10.4f}")
+
+
+if __name__ == '__main__':
+    main()
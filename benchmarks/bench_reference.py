@@ -0,0 +1,83 @@
+"""
+Benchmark: matching a shot against a reference library with banded DTW.
+
+Builds synthetic libraries of --sizes references (time-warped, noisy variants of
+a few prototype drives), then times ReferenceLibrary.match (LB_Keogh-pruned)
+against exact banded DTW over every reference, checks both return the same
+top-k, and reports how many references the lower bound pruned. Run from the
+repository root:
+    python -m benchmarks.bench_reference --sizes 100 1000 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from bonus.reference_library import PHASES, TRAJECTORY_METRICS, ReferenceLibrary, dtw_banded
+
+
+def synthetic_trajectories(n, samples_per_phase, rng, prototypes=8):
+    """n trajectories around `prototypes` smooth base drives, each randomly time-warped, offset and noised."""
+    length = len(PHASES) * samples_per_phase
+    t = np.linspace(0.0, 1.0, length)
+    bases = []
+    for _ in range(prototypes):
+        freqs = rng.uniform(0.5, 2.5, len(TRAJECTORY_METRICS))
+        phases = rng.uniform(0, np.pi, len(TRAJECTORY_METRICS))
+        scales = np.array([20.0, 8.0, 0.3, 15.0])
+        centers = np.array([150.0, 15.0, 0.4, 40.0])
+        bases.append(centers + scales * np.sin(2 * np.pi * freqs * t[:, None] + phases))
+    trajectories = np.empty((n, length, len(TRAJECTORY_METRICS)), dtype=np.float32)
+    for i in range(n):
+        base = bases[rng.integers(prototypes)]
+        # A monotone time warp: cumulative sum of positive random speeds.
+        warp = np.cumsum(rng.uniform(0.5, 1.5, length))
+        warp = (warp - warp[0]) / (warp[-1] - warp[0])
+        warped = np.stack([np.interp(warp, t, base[:, m]) for m in range(base.shape[1])], axis=1)
+        noise = rng.normal(0, 1, warped.shape) * np.array([2.0, 1.0, 0.03, 2.0])
+        trajectories[i] = warped + noise + rng.normal(0, 1, len(TRAJECTORY_METRICS)) * np.array([3.0, 2.0, 0.05, 3.0])
+    return trajectories
+
+
+def brute_force(library, trajectory, top_k, band_fraction, batch_size=64):
+    """Exact banded DTW against every reference, no pruning."""
+    radius = max(1, int(round(band_fraction * len(trajectory))))
+    query = (trajectory.astype(np.float64) - library.mean) / library.std
+    distances = np.concatenate([dtw_banded(query, library._normalized[start:start + batch_size], radius)
+                                for start in range(0, len(library), batch_size)])
+    return [library.names[i] for i in np.argsort(distances, kind='stable')[:top_k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--samples-per-phase', type=int, default=20)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--band-fraction', type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'references':>10} {'brute force':>12} {'pruned':>10} {'speedup':>8} {'DTW computed':>13} {'same top-k':>11}")
+    for size in args.sizes:
+        trajectories = synthetic_trajectories(size + args.queries, args.samples_per_phase, rng)
+        library = ReferenceLibrary([f"ref{i}" for i in range(size)], trajectories[:size], args.samples_per_phase)
+        queries = trajectories[size:]
+        brute_seconds = pruned_seconds = 0.0
+        computed = 0
+        same = True
+        for query in queries:
+            start = time.perf_counter()
+            expected = brute_force(library, query, args.top_k, args.band_fraction)
+            brute_seconds += time.perf_counter() - start
+            start = time.perf_counter()
+            matches, stats = library.match(query, args.top_k, args.band_fraction)
+            pruned_seconds += time.perf_counter() - start
+            computed += stats['dtw_computed']
+            same &= [match['name'] for match in matches] == expected
+        n = len(queries)
+        print(f"{size:>10} {brute_seconds / n * 1000:>10.1f}ms {pruned_seconds / n * 1000:>8.1f}ms "
+              f"{brute_seconds / pruned_seconds:>7.1f}x {computed / n / size:>12.1%} {str(same):>11}")
+
+if __name__ == '__main__':
+    main()
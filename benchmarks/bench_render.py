@@ -0,0 +1,107 @@
+"""
+Benchmark: overlay rendering only (no pose inference, decoding or encoding).
+
+Runs the first pass once to get real landmarks and metrics, holds the decoded
+frames in memory, then times drawing the skeleton and dashboard onto every
+frame with the previous drawing_utils/addWeighted path and with
+OverlayRenderer, and checks both produce identical pixels. Also times the full
+render pass (decode, draw, encode) as analyze_video runs it. Pass --upscale 3
+to render at a resolution closer to phone uploads. Run from the repository root:
+    python -m benchmarks.bench_render --video input_video.mp4 --upscale 1 3
+"""
+import argparse
+import tempfile
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from analysis_module import PoseAnalyzer
+from overlay_renderer import OverlayRenderer
+
+
+def draw_with_drawing_utils(analyzer, frame, metrics, feedback, frame_index, current_phase=""):
+    """The overlay code as it was before OverlayRenderer, kept here as the reference."""
+    mp_drawing = mp.solutions.drawing_utils
+    landmarks = analyzer.landmark_store.to_landmark_list(frame_index)
+    mp_drawing.draw_landmarks(frame, landmarks, mp.solutions.pose.POSE_CONNECTIONS, mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2), mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2))
+    frame_height, _, _ = frame.shape
+    dashboard_start_y = frame_height - 220
+    sub_img = frame[dashboard_start_y:frame_height, 0:450]; white_rect = np.ones(sub_img.shape, dtype=np.uint8) * 50
+    res = cv2.addWeighted(sub_img, 0.5, white_rect, 0.5, 1.0); frame[dashboard_start_y:frame_height, 0:450] = res
+    if current_phase:
+        cv2.putText(frame, f"Phase: {current_phase}", (10, dashboard_start_y + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 0), 2)
+    text_start_y = dashboard_start_y + 70
+    if 'front_elbow_angle' in metrics: cv2.putText(frame, f"Elbow Angle: {int(metrics['front_elbow_angle'])} deg", (10, text_start_y), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    if 'spine_lean' in metrics: cv2.putText(frame, f"Spine Lean: {int(metrics['spine_lean'])} deg", (10, text_start_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    if 'head_knee_alignment' in metrics: cv2.putText(frame, f"Head Align: {metrics['head_knee_alignment']:.2f} (ratio)", (10, text_start_y + 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    if 'elbow' in feedback: cv2.putText(frame, feedback['elbow'][0], (10, text_start_y + 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback['elbow'][1], 2)
+    if 'head' in feedback: cv2.putText(frame, feedback['head'][0], (10, text_start_y + 150), cv2.FONT_HERSHEY_SIMPLEX, 0.8, feedback['head'][1], 2)
+    return frame
+
+
+def read_all_frames(video_path, upscale):
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        if upscale != 1:
+            frame = cv2.resize(frame, None, fx=upscale, fy=upscale, interpolation=cv2.INTER_LINEAR)
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def time_overlays(draw, analyzer, frames, repeats):
+    """Best-of-`repeats` overlay fps, plus the drawn frames from the last repeat."""
+    best, drawn = float('inf'), []
+    for _ in range(repeats):
+        drawn = []
+        elapsed = 0.0
+        for frame_index, frame in enumerate(frames):
+            frame = frame.copy()
+            metrics = analyzer.metrics_over_time.row(frame_index)
+            if metrics is not None and analyzer.landmark_store.get(frame_index) is not None:
+                feedback = analyzer._generate_feedback(metrics)
+                phase = analyzer.phases_per_frame[frame_index] if frame_index < len(analyzer.phases_per_frame) else ""
+                start = time.perf_counter()
+                draw(frame, metrics, feedback, frame_index, phase)
+                elapsed += time.perf_counter() - start
+            drawn.append(frame)
+        best = min(best, elapsed)
+    return len(frames) / best, drawn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--upscale', type=int, nargs='+', default=[1])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as run_dir:
+        analyzer = PoseAnalyzer(args.video, run_dir=run_dir, workers=1, mode='full')
+        analyzer.process_video_first_pass()
+        analyzer.generate_reports(run_bonus_features=True)
+
+        for upscale in args.upscale:
+            frames = read_all_frames(args.video, upscale)
+            height, width = frames[0].shape[:2]
+            renderer = OverlayRenderer()
+            old_fps, old_frames = time_overlays(lambda *a: draw_with_drawing_utils(analyzer, *a), analyzer, frames, args.repeats)
+            new_fps, new_frames = time_overlays(
+                lambda frame, metrics, feedback, frame_index, phase: renderer.draw(frame, analyzer.landmark_store.get(frame_index), metrics, feedback, phase),
+                analyzer, frames, args.repeats)
+            identical = all(np.array_equal(a, b) for a, b in zip(old_frames, new_frames))
+            print(f"{width}x{height}: overlays {old_fps:.0f} fps (drawing_utils) -> {new_fps:.0f} fps (OverlayRenderer), "
+                  f"{new_fps / old_fps:.2f}x, identical pixels: {identical}")
+
+        start = time.perf_counter()
+        analyzer._write_annotated_video()
+        elapsed = time.perf_counter() - start
+        print(f"Full render pass (decode + draw + encode) at source resolution: {analyzer.landmark_store.frame_count / elapsed:.0f} fps")
+
+if __name__ == '__main__':
+    main()
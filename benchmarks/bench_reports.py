@@ -0,0 +1,68 @@
+"""
+Benchmark: cold import time and per-report cost of the chart and HTML export.
+
+Each import is timed in a fresh interpreter, best of --repeats. The report case
+runs export_temporal_chart + export_html_report on a synthetic shot of --frames
+frames, first in a fresh interpreter (including the charting imports) and then
+warm, best of --repeats. Run from the repository root:
+    python -m benchmarks.bench_reports --frames 300 10000
+"""
+import argparse
+import subprocess
+import sys
+
+IMPORTS = ('analysis_module', 'bonus.analysis_enhancer', 'overlay_renderer', 'scoring', 'batch', 'app')
+
+REPORT_CODE = """
+import os, sys, tempfile, time
+from benchmarks.synthetic import synthetic_landmarks
+from metrics_engine import compute_metrics_batch
+from metrics_store import MetricsStore
+from scoring import evaluate_shot
+from settings import load_config
+from bonus.analysis_enhancer import BonusAnalyzer
+
+landmarks, detected = synthetic_landmarks({frames})
+columns, valid = compute_metrics_batch(landmarks, detected, 1920, 1080)
+metrics = MetricsStore(len(valid))
+metrics.assign(columns, valid)
+timings = []
+with tempfile.TemporaryDirectory() as output_dir, open(os.devnull, 'w') as devnull:
+    bonus = BonusAnalyzer(metrics, output_dir, load_config())
+    impact = bonus.find_impact_moment()
+    for _ in range({repeats} + 1):
+        evaluation = bonus.add_skill_grade_to_evaluation(evaluate_shot(metrics, impact))
+        stdout, sys.stdout = sys.stdout, devnull
+        start = time.perf_counter()
+        bonus.export_temporal_chart(impact)
+        bonus.export_html_report(evaluation, os.path.join(output_dir, 'elbow_angle_chart.png'))
+        timings.append(time.perf_counter() - start)
+        sys.stdout = stdout
+print(timings[0], min(timings[1:]))
+"""
+
+
+def run(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return [float(value) for value in output.strip().splitlines()[-1].split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, nargs='+', default=[300, 10000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print("Cold import (fresh interpreter):")
+    for module in IMPORTS:
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        best = min(run(code)[0] for _ in range(args.repeats))
+        print(f"  {module:<26} {best * 1000:7.0f} ms")
+
+    print("Chart + HTML report:")
+    for frames in args.frames:
+        first, warm = run(REPORT_CODE.format(frames=frames, repeats=args.repeats))
+        print(f"  {frames:>7} frames: first report {first * 1000:6.0f} ms, warm {warm * 1000:6.1f} ms")
+
+if __name__ == '__main__':
+    main()
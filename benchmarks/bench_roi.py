@@ -0,0 +1,81 @@
+"""
+Benchmark: full-frame inference vs. downscaled and batter-ROI inference.
+
+Reports first-pass fps and, per metric, the mean absolute drift against
+full-frame inference over the frames both runs detected. Pass --upscale 3 to
+benchmark a higher-resolution copy of the clip (closer to phone uploads).
+Run from the repository root:
+    python -m benchmarks.bench_roi --video input_video.mp4 --upscale 3
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from analysis_module import PoseAnalyzer
+from metrics_store import METRIC_NAMES
+from roi import InferenceRegion
+
+SETTINGS = [
+    ('full frame', {}),
+    ('scale 0.5', {'scale': 0.5}),
+    ('max side 640', {'max_side': 640}),
+    ('roi', {'use_roi': True}),
+    ('roi + max side 640', {'use_roi': True, 'max_side': 640}),
+]
+
+
+def upscale_video(video_path, factor, out_path):
+    cap = cv2.VideoCapture(video_path)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) * factor, int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) * factor)
+    out = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*'mp4v'), cap.get(cv2.CAP_PROP_FPS), size)
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        out.write(cv2.resize(frame, size, interpolation=cv2.INTER_CUBIC))
+    cap.release()
+    out.release()
+    return size
+
+
+def first_pass(video_path, options):
+    with tempfile.TemporaryDirectory() as run_dir:
+        analyzer = PoseAnalyzer(video_path, run_dir=run_dir, workers=1, mode='full')
+        analyzer.inference_region = InferenceRegion(**options)
+        start = time.perf_counter()
+        analyzer.process_video_first_pass()
+        elapsed = time.perf_counter() - start
+    return analyzer.metrics_over_time, analyzer.landmark_store.frame_count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--upscale', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        video_path = args.video
+        if args.upscale > 1:
+            video_path = os.path.join(tmp, 'upscaled.mp4')
+            size = upscale_video(args.video, args.upscale, video_path)
+            print(f"Benchmarking a {size[0]}x{size[1]} copy of {args.video}")
+
+        reference, reference_fps = None, None
+        for label, options in SETTINGS:
+            metrics, fps = first_pass(video_path, options)
+            line = f"{label:<20} {fps:6.1f} fps  detected {metrics.valid_count}"
+            if reference is None:
+                reference, reference_fps = metrics, fps
+            else:
+                both = reference.valid & metrics.valid
+                drift = {name: round(float(np.mean(np.abs(metrics[name][both] - reference[name][both]))), 3)
+                         for name in METRIC_NAMES}
+                line += f"  ({fps / reference_fps:.2f}x)  mean |drift| {drift}"
+            print(line)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: streaming multi-shot analysis of a long recording.
+
+Builds a synthetic net session by repeating the bundled clip, streams it through
+session.analyze_session and reports the shots found against the known impact
+frames, throughput, and peak traced memory (which should not grow with the
+number of repeats). Run from the repository root:
+    python -m benchmarks.bench_session --video input_video.mp4 --repeats 1 4
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import cv2
+
+from session import analyze_session
+
+
+def repeat_video(video_path, repeats, out_path):
+    cap = cv2.VideoCapture(video_path)
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        frames.append(frame)
+    out = cv2.VideoWriter(out_path, cv2.VideoWriter_fourcc(*'mp4v'), cap.get(cv2.CAP_PROP_FPS), size)
+    for _ in range(repeats):
+        for frame in frames:
+            out.write(frame)
+    cap.release()
+    out.release()
+    return len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--repeats', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for repeats in args.repeats:
+            session_video = os.path.join(tmp, f'session_{repeats}.mp4')
+            clip_frames = repeat_video(args.video, repeats, session_video)
+            tracemalloc.start()
+            start = time.perf_counter()
+            shots = list(analyze_session(session_video, output_dir=tmp))
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            impacts = [shot['impact_frame'] for shot in shots]
+            # Each repeat's impact should land on (about) the same clip frame as the first one.
+            matched = len(impacts) == repeats and all(abs(impact - impacts[0] - i * clip_frames) <= 3
+                                                      for i, impact in enumerate(impacts))
+            print(f"{repeats} repeat(s), {repeats * clip_frames} frames: {len(shots)} shot(s) at {impacts} "
+                  f"(one per repeat, within 3 frames: {matched}), "
+                  f"{repeats * clip_frames / elapsed:.1f} fps, peak traced memory {peak / 2**20:.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: startup and per-request latency with and without the pose pool.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --video input_video.mp4
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import cv2
+
+
+def measure_import(module):
+    """Cold import time of a module in a fresh interpreter."""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def first_frame(video_path):
+    cap = cv2.VideoCapture(video_path)
+    ret, frame = cap.read()
+    cap.release()
+    if not ret:
+        raise SystemExit(f"Could not read a frame from {video_path}")
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--requests', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Cold import of analysis_module: {measure_import('analysis_module') * 1000:.0f} ms")
+
+    import mediapipe as mp
+    from analysis_module import POSE_OPTIONS
+    from pose_pool import PosePool
+    from settings import load_config
+
+    image = first_frame(args.video)
+
+    fresh = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        pose = mp.solutions.pose.Pose(**POSE_OPTIONS)
+        pose.process(image)
+        fresh.append(time.perf_counter() - start)
+        pose.close()
+
+    start = time.perf_counter()
+    pool = PosePool(1, POSE_OPTIONS)
+    pool_startup = time.perf_counter() - start
+    pooled = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        with pool.checkout() as pose:
+            pose.process(image)
+        pooled.append(time.perf_counter() - start)
+        # Leave time between requests for the background recycle (reset + warm-up frame).
+        time.sleep(0.5)
+    pool.close()
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        with open('config.json') as f:
+            json.load(f)
+    config_parse = (time.perf_counter() - start) / args.requests
+    load_config()
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        load_config()
+    config_cached = (time.perf_counter() - start) / args.requests
+
+    print(f"Pool warm-up at startup:            {pool_startup * 1000:.0f} ms (paid once per process)")
+    print(f"First-frame latency, new graph:     first {fresh[0] * 1000:.0f} ms, mean {sum(fresh) / len(fresh) * 1000:.0f} ms")
+    print(f"First-frame latency, pooled graph:  first {pooled[0] * 1000:.0f} ms, mean {sum(pooled) / len(pooled) * 1000:.0f} ms")
+    print(f"Config: json parse {config_parse * 1e6:.0f} us vs cached load_config {config_cached * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
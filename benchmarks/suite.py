@@ -0,0 +1,203 @@
+"""
+Benchmark suite: pipeline stages in isolation and end to end, with a saved baseline.
+
+Synthetic cases build landmark sequences of each --frames length (no MediaPipe)
+and time the per-frame and batch metrics paths, the BonusAnalyzer steps,
+scoring and the chart/HTML export. Video cases run process_video_first_pass,
+_write_annotated_video and the whole analysis on --video. Each case reports its
+best of --repeats runs (the least disturbed by other load on the machine).
+
+    python -m benchmarks.suite --frames 10000 100000 1000000 --save benchmarks/baseline.json
+    python -m benchmarks.suite --frames 10000 100000 1000000 --compare benchmarks/baseline.json
+
+With --compare, every case more than --tolerance slower than the baseline is
+flagged as a regression and the exit status is 1. Run from the repository root.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from benchmarks.synthetic import synthetic_landmarks
+from bonus.analysis_enhancer import BonusAnalyzer
+from metrics_engine import compute_frame_metrics, compute_metrics_batch
+from metrics_store import MetricsStore
+from scoring import evaluate_shot
+from settings import load_config
+
+FRAME_WIDTH, FRAME_HEIGHT = 1920, 1080
+
+
+def measure(fn, repeats, setup=None, min_batch_seconds=0.05):
+    """
+    Best (lowest) wall seconds per call of fn(state) over `repeats` batches.
+
+    Without `setup`, fast functions are called enough times per batch to fill
+    `min_batch_seconds`, so microsecond-scale cases are not lost in timer noise.
+    With `setup`, state = setup() is rebuilt (untimed) before every single call.
+    The stages' progress prints are discarded while timing.
+    """
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        return _measure(fn, repeats, setup, min_batch_seconds)
+
+
+def _measure(fn, repeats, setup, min_batch_seconds):
+    number = 1
+    if setup is None:
+        start = time.perf_counter()
+        fn(None)
+        number = max(1, int(min_batch_seconds / max(time.perf_counter() - start, 1e-9)))
+    timings = []
+    for _ in range(repeats):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        for _ in range(number):
+            fn(state)
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def synthetic_cases(n_frames, repeats, per_frame_cap, output_dir):
+    """(case name, seconds, frames) for the non-inference stages; frames is None for length-independent steps."""
+    config = load_config()
+    landmarks, detected = synthetic_landmarks(n_frames)
+    columns, valid = compute_metrics_batch(landmarks, detected, FRAME_WIDTH, FRAME_HEIGHT)
+    metrics = MetricsStore(len(valid))
+    metrics.assign(columns, valid)
+    bonus = BonusAnalyzer(metrics, output_dir, config)
+    impact = bonus.find_impact_moment()
+    cases = []
+
+    def add(name, fn, frames=n_frames, setup=None):
+        cases.append((f"{name}[{n_frames}]", measure(fn, repeats, setup), frames))
+
+    # The per-frame path is slow by design; time it on a prefix and report its rate.
+    sample = min(n_frames, per_frame_cap)
+    frames = [[SimpleNamespace(x=float(x), y=float(y)) for x, y in frame[:, :2]] for frame in landmarks[:sample]]
+    add("calculate_metrics", lambda _: [compute_frame_metrics(frame, FRAME_WIDTH, FRAME_HEIGHT) for frame in frames], sample)
+    add("metrics_batch", lambda _: compute_metrics_batch(landmarks, detected, FRAME_WIDTH, FRAME_HEIGHT))
+    add("find_impact_moment", lambda _: bonus.find_impact_moment())
+    add("segment_shot_phases", lambda _: bonus.segment_shot_phases(impact))
+    add("evaluate_shot", lambda _: evaluate_shot(metrics, impact))
+    add("reference_comparison", lambda _: bonus.add_reference_comparison({}, impact), None)
+    add("temporal_chart", lambda _: bonus.export_temporal_chart(impact))
+    chart_path = os.path.join(output_dir, 'elbow_angle_chart.png')
+    add("html_report", lambda evaluation: bonus.export_html_report(evaluation, chart_path), None,
+        setup=lambda: bonus.add_skill_grade_to_evaluation(evaluate_shot(metrics, impact)))
+    return cases
+
+
+def video_cases(video_path, repeats, output_dir):
+    """(case name, seconds, frames) for the MediaPipe-backed stages on a real clip."""
+    from analysis_module import PoseAnalyzer
+
+    def analyzer():
+        return PoseAnalyzer(video_path, run_dir=tempfile.mkdtemp(dir=output_dir), workers=1, mode='full')
+
+    def analyzed():
+        state = analyzer()
+        state.process_video_first_pass()
+        state.generate_reports(run_bonus_features=True)
+        return state
+
+    def end_to_end(state):
+        state.process_video_first_pass()
+        state.generate_outputs(run_bonus_features=True)
+
+    cap = cv2.VideoCapture(video_path)
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    name = os.path.basename(video_path)
+    return [
+        (f"first_pass[{name}]", measure(lambda state: state.process_video_first_pass(), repeats, analyzer), frames),
+        (f"write_annotated_video[{name}]", measure(lambda state: state._write_annotated_video(), repeats, analyzed), frames),
+        (f"end_to_end[{name}]", measure(end_to_end, repeats, analyzer), frames),
+    ]
+
+
+def environment():
+    import mediapipe
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'mediapipe': mediapipe.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Prints each case against the baseline; returns the names of cases that regressed."""
+    regressions = []
+    print(f"\n{'case':<42} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<42} {'-':>10} {current['seconds']:>9.5f}s {'new':>7}")
+            continue
+        ratio = current['seconds'] / before['seconds'] if before['seconds'] else float('inf')
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{name:<42} {before['seconds']:>9.5f}s {current['seconds']:>9.5f}s {ratio:>6.2f}x{flag}")
+    for name in baseline:
+        if name not in results:
+            print(f"{name:<42} (in baseline, not run)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--video', default='input_video.mp4')
+    parser.add_argument('--no-video', action='store_true', help="skip the MediaPipe-backed cases")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--per-frame-cap', type=int, default=20000, help="frames used for the per-frame metrics case")
+    parser.add_argument('--save', help="write the results to this JSON baseline file")
+    parser.add_argument('--compare', help="compare against this JSON baseline file")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="allowed slowdown before a case is flagged")
+    args = parser.parse_args()
+
+    cases = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for n_frames in args.frames:
+            cases.extend(synthetic_cases(n_frames, args.repeats, args.per_frame_cap, output_dir))
+        if not args.no_video:
+            cases.extend(video_cases(args.video, args.repeats, output_dir))
+
+    results = {}
+    print(f"\n{'case':<42} {'seconds':>10} {'frames/s':>14}")
+    for name, seconds, frames in cases:
+        fps = round(frames / seconds, 1) if frames and seconds > 0 else None
+        results[name] = {'seconds': seconds, 'frames': frames, 'fps': fps}
+        print(f"{name:<42} {seconds:>9.5f}s {f'{fps:,.1f}' if fps else '-':>14}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'environment': environment(), 'repeats': args.repeats, 'results': results}, f, indent=4)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != environment():
+            print("\nNote: the baseline was recorded on a different environment; ratios may not be comparable.")
+        regressions = compare(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%}.")
+
+if __name__ == '__main__':
+    main()
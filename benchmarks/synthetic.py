@@ -0,0 +1,22 @@
+import numpy as np
+
+from landmark_store import NUM_LANDMARKS, LANDMARK_FIELDS
+
+
+def synthetic_landmarks(n_frames, missing_rate=0.05, seed=0):
+    """
+    Generates a plausible-looking landmark sequence without running MediaPipe.
+
+    Returns an (n_frames, 33, 4) float32 array of normalized landmarks that drift
+    smoothly around a random base pose, and an (n_frames,) detection mask with
+    roughly `missing_rate` of the frames dropped.
+    """
+    rng = np.random.default_rng(seed)
+    base_pose = rng.uniform(0.3, 0.7, size=(NUM_LANDMARKS, 2))
+    drift = np.cumsum(rng.normal(0, 0.002, size=(n_frames, NUM_LANDMARKS, 2)), axis=0)
+    landmarks = np.empty((n_frames, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    landmarks[:, :, :2] = np.clip(base_pose + drift, 0.0, 1.0)
+    landmarks[:, :, 2] = rng.normal(0, 0.1, size=(n_frames, NUM_LANDMARKS))
+    landmarks[:, :, 3] = rng.uniform(0.6, 1.0, size=(n_frames, NUM_LANDMARKS))
+    detected = rng.random(n_frames) >= missing_rate
+    return landmarks, detected
@@ -1,8 +1,10 @@
 import numpy as np
-import matplotlib.pyplot as plt
+import io
 import os
 import base64
 
+from bonus.reference_library import METRIC_UNITS, TRAJECTORY_METRICS, ReferenceLibrary, phase_normalized_trajectory
+
 class BonusAnalyzer:
     """
     A class to handle all the advanced (bonus) analysis features.
@@ -11,32 +13,57 @@ class BonusAnalyzer:
         self.metrics_over_time = metrics_over_time
         self.output_dir = output_dir
         self.config = config
+        # The last chart rendered, as (path, PNG bytes), so the HTML report can embed it without re-reading it.
+        self._chart = (None, None)
+
+    def _to_video_frames(self, per_row_values):
+        """Spreads values computed over the valid frames onto every video frame."""
+        if not per_row_values:
+            return per_row_values
+        rows = np.clip(np.cumsum(self.metrics_over_time.valid) - 1, 0, len(per_row_values) - 1)
+        return [per_row_values[row] for row in rows]
 
     def find_impact_moment(self):
-        wrist_y_coords = self.metrics_over_time.get('wrist_y_coords', [])
-        if not wrist_y_coords or len(wrist_y_coords) < 2:
+        """Returns the video frame with the fastest downward wrist movement between valid frames."""
+        valid_frames = self.metrics_over_time.valid_frame_indices()
+        if len(valid_frames) < 2:
             return None
-        velocities = [wrist_y_coords[i] - wrist_y_coords[i-1] for i in range(1, len(wrist_y_coords))]
-        impact_frame_index = np.argmax(velocities) + 1 if velocities else None
+        wrist_y_coords = self.metrics_over_time.valid_values('wrist_y_coords')
+        velocities = np.diff(wrist_y_coords)
+        impact_frame_index = int(valid_frames[np.argmax(velocities) + 1])
         print(f"BONUS: Impact detected at frame index: {impact_frame_index}")
         return impact_frame_index
 
+    def _backswing_peak_row(self, impact_frame_index):
+        """Rows (among the valid frames) of the impact and of the backswing peak before it."""
+        wrist_y = self.metrics_over_time.valid_values('wrist_y_coords')
+        impact_row = int(np.searchsorted(self.metrics_over_time.valid_frame_indices(), impact_frame_index))
+        # Find the peak of the backswing (highest point, which is min y-value)
+        # Search only before the impact frame
+        peak_row = int(np.argmin(wrist_y[:impact_row])) if impact_row > 0 else 0
+        return impact_row, peak_row
+
+    def find_backswing_peak(self, impact_frame_index):
+        """Returns the video frame of the backswing peak before impact."""
+        if impact_frame_index is None or self.metrics_over_time.valid_count == 0:
+            return None
+        _, peak_row = self._backswing_peak_row(impact_frame_index)
+        return int(self.metrics_over_time.valid_frame_indices()[peak_row])
+
     def segment_shot_phases(self, impact_frame_index):
-        """Segments the shot into phases based on wrist and hip movement."""
+        """Segments the shot into phases based on wrist and hip movement, one entry per video frame."""
         if impact_frame_index is None:
-            return ["Analysis"] * len(self.metrics_over_time['wrist_y_coords'])
+            return ["Analysis"] * len(self.metrics_over_time)
 
-        wrist_y = np.array(self.metrics_over_time['wrist_y_coords'])
-        
-        # Find the peak of the backswing (highest point, which is min y-value)
-        # Search only before the impact frame
-        peak_backswing_frame = np.argmin(wrist_y[:impact_frame_index]) if impact_frame_index > 0 else 0
+        # Work over the valid frames only, then spread the result back onto every video frame.
+        wrist_y = self.metrics_over_time.valid_values('wrist_y_coords')
+        impact_row, peak_backswing_frame = self._backswing_peak_row(impact_frame_index)
 
         phases = []
         for i in range(len(wrist_y)):
             if i < peak_backswing_frame:
                 phases.append("Backswing")
-            elif i < impact_frame_index:
+            elif i < impact_row:
                 phases.append("Downswing")
             else:
                 phases.append("Follow-through")
@@ -49,7 +76,7 @@ class BonusAnalyzer:
                  break
         
         print("BONUS: Shot phases segmented.")
-        return phases
+        return self._to_video_frames(phases)
 
     def add_skill_grade_to_evaluation(self, evaluation):
         scores = [details['score'] for category, details in evaluation.items() if 'score' in details]
@@ -73,7 +100,7 @@ class BonusAnalyzer:
 
         # Compare elbow angle
         elbow_ref = reference_metrics['front_elbow_angle']
-        elbow_actual = self.metrics_over_time['front_elbow_angle'][impact_frame_index]
+        elbow_actual = self.metrics_over_time.value('front_elbow_angle', impact_frame_index)
         if elbow_ref['min'] <= elbow_actual <= elbow_ref['max']:
             deviation_elbow = 0 # Perfect
         else:
@@ -85,7 +112,7 @@ class BonusAnalyzer:
 
         # Compare spine lean
         spine_ref = reference_metrics['spine_lean']
-        spine_actual = self.metrics_over_time['spine_lean'][impact_frame_index]
+        spine_actual = self.metrics_over_time.value('spine_lean', impact_frame_index)
         if spine_ref['min'] <= spine_actual <= spine_ref['max']:
             deviation_spine = 0
         else:
@@ -104,29 +131,80 @@ class BonusAnalyzer:
         }
         return evaluation
 
+    def add_trajectory_match(self, evaluation, phases_per_frame):
+        """
+        Matches the whole shot against the reference library (config "reference_library")
+        with DTW and adds a "Reference Match" entry; unchanged when there is no library.
+        """
+        settings = self.config.get('reference_library', {})
+        path = settings.get('path', "")
+        if not path or not os.path.exists(path):
+            return evaluation
+        library = ReferenceLibrary.load(path)
+        trajectory = phase_normalized_trajectory(self.metrics_over_time, phases_per_frame, library.samples_per_phase)
+        matches, stats = library.match(trajectory, top_k=settings.get('top_k', 3),
+                                       band_fraction=settings.get('band_fraction', 0.1))
+        if not matches:
+            return evaluation
+        print(f"BONUS: Matched shot against {stats['references']} reference drives "
+              f"({stats['dtw_computed']} DTW comparisons after LB_Keogh pruning)")
+
+        best = matches[0]
+        match_score = max(0, 10 * (1 - best['distance'] / settings.get('zero_score_distance', 2.0)))
+        # The single largest phase deviation, measured in library standard deviations so
+        # angles and ratios compare fairly.
+        phase, metric, deviation = max(
+            ((phase, metric, value) for phase, deviations in best['phase_deviations'].items()
+             for metric, value in deviations.items()),
+            key=lambda item: abs(item[2]) / library.std[TRAJECTORY_METRICS.index(item[1])])
+        unit = METRIC_UNITS[metric]
+        evaluation['Reference Match'] = {
+            'score': round(match_score, 1),
+            'feedback': f"Closest reference drive: {best['name']}. Largest difference: "
+                        f"{metric.replace('_', ' ')} during the {phase} phase, "
+                        f"{abs(deviation):.1f}{' ' + unit if unit else ''} {'above' if deviation > 0 else 'below'} the reference.",
+            'matches': matches,
+        }
+        return evaluation
+
     def export_temporal_chart(self, impact_frame_index=None):
-        if not self.metrics_over_time.get('front_elbow_angle'):
+        if self.metrics_over_time.valid_count == 0:
             print("BONUS: Cannot generate chart, no elbow angle data."); return
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.metrics_over_time['front_elbow_angle'], label='Front Elbow Angle')
+        # Imported here: matplotlib takes a few hundred ms to import and only charting needs it.
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # A standalone Figure on an Agg canvas keeps no pyplot global state, so concurrent analyses can chart at once.
+        figure = Figure(figsize=(10, 6))
+        FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        # NaN entries (frames without a pose) show up as gaps in the line.
+        axes.plot(self.metrics_over_time['front_elbow_angle'], label='Front Elbow Angle')
         if impact_frame_index is not None:
-            plt.axvline(x=impact_frame_index, color='r', linestyle='--', label=f'Impact Moment (Frame {impact_frame_index})')
-        plt.title("Elbow Angle Consistency During Shot")
-        plt.xlabel("Frame Number"); plt.ylabel("Angle (Degrees)")
-        plt.legend(); plt.grid(True)
+            axes.axvline(x=impact_frame_index, color='r', linestyle='--', label=f'Impact Moment (Frame {impact_frame_index})')
+        axes.set_title("Elbow Angle Consistency During Shot")
+        axes.set_xlabel("Frame Number"); axes.set_ylabel("Angle (Degrees)")
+        axes.legend(); axes.grid(True)
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format='png')
         chart_path = os.path.join(self.output_dir, 'elbow_angle_chart.png')
-        plt.savefig(chart_path); plt.close()
+        with open(chart_path, 'wb') as f:
+            f.write(buffer.getvalue())
+        self._chart = (chart_path, buffer.getvalue())
         print(f"BONUS: Temporal consistency chart saved to {chart_path}")
 
     def export_html_report(self, evaluation, chart_path):
         """Generates a self-contained HTML report of the analysis."""
         print("BONUS: Generating HTML report...")
         
-        # Encode chart image to base64 to embed it in the HTML
+        # Encode chart image to base64 to embed it in the HTML (straight from memory if this analyzer just drew it)
         chart_base64 = ""
+        rendered_path, chart_png = self._chart
         try:
-            with open(chart_path, "rb") as image_file:
-                chart_base64 = base64.b64encode(image_file.read()).decode()
+            if chart_png is None or rendered_path != chart_path:
+                with open(chart_path, "rb") as image_file:
+                    chart_png = image_file.read()
+            chart_base64 = base64.b64encode(chart_png).decode()
         except Exception as e:
             print(f"Could not embed chart in HTML report: {e}")
 
@@ -0,0 +1,267 @@
+"""
+A library of reference drives, matched against new shots with banded DTW.
+
+Each reference is a phase-normalized trajectory: the valid frames of every shot
+phase (Stance, Backswing, Downswing, Follow-through) are resampled to a fixed
+number of samples, for each of TRAJECTORY_METRICS. A shot is matched by
+z-normalizing its trajectory with the library's per-metric statistics, ranking
+all references by LB_Keogh (a cheap lower bound on DTW), and computing exact
+banded DTW only for candidates whose bound can still beat the k-th best match.
+
+Build or extend a library from saved analysis artifacts (from the repository root):
+    python -m bonus.reference_library add references/library.npz output/analysis_<timestamp> --name "Coach A"
+    python -m bonus.reference_library list references/library.npz
+"""
+import argparse
+import functools
+import os
+
+import numpy as np
+
+PHASES = ("Stance", "Backswing", "Downswing", "Follow-through")
+TRAJECTORY_METRICS = ('front_elbow_angle', 'spine_lean', 'head_knee_alignment', 'front_foot_direction')
+METRIC_UNITS = {'front_elbow_angle': "deg", 'spine_lean': "deg", 'head_knee_alignment': "", 'front_foot_direction': "deg"}
+
+
+def phase_normalized_trajectory(metrics, phases_per_frame, samples_per_phase=20):
+    """
+    Resamples a shot's metrics phase by phase into a (len(PHASES) * samples_per_phase, M) array.
+
+    Only valid frames are used. A phase the shot does not have (e.g. no detected
+    stance) is held at the value where it would have started.
+    """
+    valid_frames = metrics.valid_frame_indices()
+    if len(valid_frames) == 0:
+        return None
+    values = np.stack([metrics.valid_values(name) for name in TRAJECTORY_METRICS], axis=1)
+    phases = np.array([phases_per_frame[frame] if frame < len(phases_per_frame) else "" for frame in valid_frames])
+    trajectory = np.empty((len(PHASES) * samples_per_phase, len(TRAJECTORY_METRICS)), dtype=np.float32)
+    position = 0
+    for p, phase in enumerate(PHASES):
+        rows = np.flatnonzero(phases == phase)
+        if len(rows) == 0:
+            segment = values[min(position, len(values) - 1)][None, :]
+        else:
+            segment = values[rows]
+            position = rows[-1] + 1
+        # Linear resampling of the phase onto samples_per_phase evenly spaced points.
+        source = np.linspace(0.0, 1.0, len(segment))
+        target = np.linspace(0.0, 1.0, samples_per_phase)
+        for m in range(segment.shape[1]):
+            trajectory[p * samples_per_phase:(p + 1) * samples_per_phase, m] = np.interp(target, source, segment[:, m]) \
+                if len(segment) > 1 else segment[0, m]
+    return trajectory
+
+
+def lb_keogh(query, references, radius):
+    """
+    LB_Keogh lower bounds of the squared banded DTW distance from `query` (L, M) to each
+    of `references` (N, L, M), using the query's upper/lower envelope within `radius`.
+    """
+    padded = np.pad(query, ((radius, radius), (0, 0)), mode='edge')
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis=0)
+    upper, lower = windows.max(axis=-1), windows.min(axis=-1)
+    above = np.maximum(references - upper, 0.0)
+    below = np.maximum(lower - references, 0.0)
+    return (above ** 2 + below ** 2).sum(axis=(1, 2))
+
+
+@functools.lru_cache(maxsize=16)
+def _band_diagonals(length, radius):
+    # Cells of the DTW matrix (1-based) inside the band, grouped by anti-diagonal i + j.
+    # Every cell on a diagonal depends only on the two previous diagonals, so each
+    # diagonal is filled in one vectorized step.
+    diagonals = []
+    for d in range(2, 2 * length + 1):
+        i = np.arange(max(1, d - length), min(length, d - 1) + 1)
+        j = d - i
+        keep = np.abs(i - j) <= radius
+        if keep.any():
+            diagonals.append((i[keep], j[keep]))
+    return diagonals
+
+
+def _dtw_matrix(query, references, radius):
+    length = len(query)
+    cost = ((query[None, :, None, :] - references[:, None, :, :]) ** 2).sum(axis=-1)
+    total = np.full((len(references), length + 1, length + 1), np.inf)
+    total[:, 0, 0] = 0.0
+    for i, j in _band_diagonals(length, radius):
+        best_previous = np.minimum(np.minimum(total[:, i - 1, j - 1], total[:, i - 1, j]), total[:, i, j - 1])
+        total[:, i, j] = cost[:, i - 1, j - 1] + best_previous
+    return total
+
+
+def dtw_banded(query, references, radius):
+    """Squared DTW distances (Sakoe-Chiba band of `radius`) from `query` (L, M) to each of `references` (B, L, M)."""
+    return _dtw_matrix(query, references, radius)[:, -1, -1]
+
+
+def dtw_path(query, reference, radius):
+    """The optimal warping path between two equal-length trajectories, as (query_index, reference_index) pairs."""
+    total = _dtw_matrix(query, reference[None], radius)[0]
+    i = j = len(query)
+    path = [(i - 1, j - 1)]
+    while (i, j) != (1, 1):
+        steps = [(i - 1, j - 1), (i - 1, j), (i, j - 1)]
+        i, j = min(steps, key=lambda step: total[step])
+        path.append((i - 1, j - 1))
+    return path[::-1]
+
+
+class ReferenceLibrary:
+    """
+    Stored reference trajectories with their names, matched by LB_Keogh-pruned banded DTW.
+
+    Trajectories are kept in metric units; z-normalization uses the per-metric mean
+    and standard deviation over the whole library, so every metric counts equally.
+    """
+    def __init__(self, names=(), trajectories=None, samples_per_phase=20):
+        self.samples_per_phase = samples_per_phase
+        self.names = list(names)
+        length = len(PHASES) * samples_per_phase
+        self.trajectories = np.zeros((0, length, len(TRAJECTORY_METRICS)), dtype=np.float32) \
+            if trajectories is None else np.asarray(trajectories, dtype=np.float32)
+        self._refresh()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _refresh(self):
+        if len(self.trajectories):
+            self.mean = self.trajectories.mean(axis=(0, 1))
+            self.std = np.maximum(self.trajectories.std(axis=(0, 1)), 1e-6)
+        else:
+            self.mean = np.zeros(len(TRAJECTORY_METRICS), dtype=np.float32)
+            self.std = np.ones(len(TRAJECTORY_METRICS), dtype=np.float32)
+        self._normalized = ((self.trajectories - self.mean) / self.std).astype(np.float64)
+
+    def add(self, name, trajectory):
+        self.names.append(name)
+        self.trajectories = np.concatenate([self.trajectories, np.asarray(trajectory, dtype=np.float32)[None]])
+        self._refresh()
+
+    @classmethod
+    def load(cls, path):
+        """Loads a library file; repeated loads of an unchanged file are served from memory."""
+        stat = os.stat(path)
+        return _load_library(path, stat.st_size, stat.st_mtime_ns)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, names=np.array(self.names, dtype=str), trajectories=self.trajectories,
+                            samples_per_phase=self.samples_per_phase, metrics=np.array(TRAJECTORY_METRICS))
+
+    def match(self, trajectory, top_k=3, band_fraction=0.1, batch_size=64):
+        """
+        The `top_k` references closest to `trajectory` by banded DTW, best first.
+
+        Each match has the reference name, its RMS distance per step (in library
+        standard deviations) and, per phase, the mean signed deviation of every
+        metric from the reference along the warping path (shot minus reference,
+        in metric units). `stats` reports how many exact DTW computations the
+        LB_Keogh prefilter let through.
+        """
+        if len(self) == 0 or trajectory is None:
+            return [], {'references': len(self), 'dtw_computed': 0}
+        length = len(trajectory)
+        radius = max(1, int(round(band_fraction * length)))
+        query = (trajectory.astype(np.float64) - self.mean) / self.std
+        bounds = lb_keogh(query, self._normalized, radius)
+        order = np.argsort(bounds)
+        best = []  # (squared distance, index), kept sorted
+        computed = 0
+        for start in range(0, len(order), batch_size):
+            candidates = order[start:start + batch_size]
+            if len(best) == top_k:
+                # Candidates come in bound order, so none after this one can beat the k-th best.
+                candidates = candidates[bounds[candidates] < best[-1][0]]
+                if len(candidates) == 0:
+                    break
+            distances = dtw_banded(query, self._normalized[candidates], radius)
+            computed += len(candidates)
+            best = sorted(best + list(zip(distances.tolist(), candidates.tolist())))[:top_k]
+
+        matches = []
+        for squared, index in best:
+            path = dtw_path(query, self._normalized[index], radius)
+            matches.append({
+                'name': self.names[index],
+                'distance': round(float(np.sqrt(squared / length)), 4),
+                'phase_deviations': self._phase_deviations(trajectory, self.trajectories[index], path),
+            })
+        return matches, {'references': len(self), 'dtw_computed': computed}
+
+    def _phase_deviations(self, trajectory, reference, path):
+        path = np.array(path)
+        differences = trajectory[path[:, 0]].astype(np.float64) - reference[path[:, 1]]
+        phase_of_step = path[:, 0] // self.samples_per_phase
+        deviations = {}
+        for p, phase in enumerate(PHASES):
+            in_phase = phase_of_step == p
+            if in_phase.any():
+                mean = differences[in_phase].mean(axis=0)
+                deviations[phase] = {name: round(float(value), 3) for name, value in zip(TRAJECTORY_METRICS, mean)}
+        return deviations
+
+
+@functools.lru_cache(maxsize=4)
+def _load_library(path, size, mtime_ns):
+    with np.load(path, allow_pickle=False) as data:
+        return ReferenceLibrary(data['names'].tolist(), data['trajectories'], int(data['samples_per_phase']))
+
+
+def library_fingerprint(path):
+    """Changes whenever the library file does; empty if there is no library."""
+    if not path or not os.path.exists(path):
+        return ""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def trajectory_from_artifact(artifact_path, samples_per_phase=20):
+    """Phase-normalized trajectory of an analysed shot, from its saved analysis artifact."""
+    from artifact import load_artifact
+    from bonus.analysis_enhancer import BonusAnalyzer
+
+    metrics = load_artifact(artifact_path)['metrics']
+    bonus = BonusAnalyzer(metrics, None, None)
+    phases = bonus.segment_shot_phases(bonus.find_impact_moment())
+    return phase_normalized_trajectory(metrics, phases, samples_per_phase)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="add analysed shots to a library (created if missing)")
+    add.add_argument('library')
+    add.add_argument('artifacts', nargs='+', help="analysis_artifact.npz files or the analysis folders holding them")
+    add.add_argument('--name', help="reference name (default: the artifact's folder name)")
+    add.add_argument('--samples-per-phase', type=int, default=20)
+    show = commands.add_parser('list', help="list the references in a library")
+    show.add_argument('library')
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        library = ReferenceLibrary.load(args.library)
+        print(f"{len(library)} reference(s), {library.samples_per_phase} samples per phase:")
+        for name in library.names:
+            print(f"  {name}")
+        return
+
+    library = ReferenceLibrary.load(args.library) if os.path.exists(args.library) \
+        else ReferenceLibrary(samples_per_phase=args.samples_per_phase)
+    for artifact_path in args.artifacts:
+        trajectory = trajectory_from_artifact(artifact_path, library.samples_per_phase)
+        if trajectory is None:
+            print(f"Skipping {artifact_path}: no pose data.")
+            continue
+        folder = artifact_path if os.path.isdir(artifact_path) else os.path.dirname(artifact_path)
+        name = args.name if args.name and len(args.artifacts) == 1 else os.path.basename(os.path.normpath(folder))
+        library.add(name, trajectory)
+        print(f"Added {name}")
+    library.save(args.library)
+    print(f"{args.library}: {len(library)} reference(s)")
+
+if __name__ == '__main__':
+    main()
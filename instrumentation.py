@@ -0,0 +1,175 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import weakref
+
+try:
+    import resource
+except ImportError:  # not available on Windows; peak RSS is then left out
+    resource = None
+
+TIMINGS_FILENAME = 'timings.json'
+_NO_OP = contextlib.nullcontext()
+# How often a run's resident memory is sampled for its peak.
+RSS_SAMPLE_SECONDS = 0.05
+
+
+class _Stage:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, time.perf_counter() - self._wall, time.process_time() - self._cpu)
+        return False
+
+
+class Profiler:
+    """
+    Per-run stage timings: calls, wall seconds and CPU seconds per named stage.
+
+    `stage(name)` times a block (CPU time is the whole process's, so it includes
+    helper threads the block starts); `wrap(name, fn)` times every call of a
+    per-frame function (CPU time of the calling thread only, so work a library
+    hands to its own threads, like MediaPipe's graph, shows up as wall time). A
+    disabled profiler hands
+    back `fn` itself and a shared no-op context, so switching it off costs nothing
+    on the per-frame paths. While enabled, a background thread samples resident
+    memory for the run's peak.
+    """
+    def __init__(self, enabled=True, sink=None):
+        self.enabled = enabled
+        self.sink = sink
+        self._stages = {}
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._peak_rss = current_rss_bytes() if enabled else None
+        self._rss_stopped = threading.Event()
+        if self._peak_rss is not None:
+            # The thread only holds a weak reference, so an abandoned profiler (a failed run) stops it too.
+            threading.Thread(target=_sample_rss, args=(weakref.ref(self), self._rss_stopped), daemon=True).start()
+
+    def add(self, name, wall_seconds, cpu_seconds, calls=1):
+        with self._lock:
+            entry = self._stages.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += wall_seconds
+            entry[2] += cpu_seconds
+
+    def stage(self, name):
+        """Context manager timing one block under `name`."""
+        if not self.enabled:
+            return _NO_OP
+        return _Stage(self, name)
+
+    def wrap(self, name, fn):
+        """Returns `fn` timed under `name` on every call (or `fn` unchanged when disabled)."""
+        if not self.enabled:
+            return fn
+
+        def timed(*args, **kwargs):
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - wall, time.thread_time() - cpu)
+        return timed
+
+    def _record_rss(self):
+        rss = current_rss_bytes() or 0
+        with self._lock:
+            self._peak_rss = max(self._peak_rss, rss)
+
+    def report(self, frames=0, pose_frames=0, detections=0, first_pass_seconds=None):
+        """
+        The run's stage table plus throughput, peak memory and pose hit rate, as plain JSON types.
+
+        `peak_rss_bytes` is the largest resident size sampled (every RSS_SAMPLE_SECONDS) between
+        this profiler's creation and the report, i.e. for this run; it is still the whole
+        process's memory, so runs sharing a process (app jobs) include each other's. It is None
+        where /proc is not available. `process_peak_rss_bytes` is the process's lifetime high-water
+        mark, which after earlier runs may belong to one of them.
+        """
+        wall_seconds = time.perf_counter() - self._started
+        if self._peak_rss is not None:
+            self._rss_stopped.set()
+            self._record_rss()
+        with self._lock:
+            stages = {name: {'calls': calls, 'wall_seconds': round(wall, 4), 'cpu_seconds': round(cpu, 4)}
+                      for name, (calls, wall, cpu) in self._stages.items()}
+        analysis_seconds = first_pass_seconds if first_pass_seconds is not None else wall_seconds
+        return {
+            'wall_seconds': round(wall_seconds, 4),
+            'first_pass_seconds': round(analysis_seconds, 4),
+            'cpu_seconds': round(time.process_time() - self._cpu_started, 4),
+            'frames': int(frames),
+            'analysis_fps': round(frames / analysis_seconds, 2) if analysis_seconds > 0 else 0.0,
+            'overall_fps': round(frames / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+            'pose_frames': int(pose_frames),
+            'detection_rate': round(detections / pose_frames, 4) if pose_frames else 0.0,
+            'peak_rss_bytes': self._peak_rss,
+            'process_peak_rss_bytes': peak_rss_bytes(),
+            'stages': stages,
+        }
+
+    def publish(self, report, output_dir):
+        """Writes timings.json into output_dir and hands the report to the sink, if any."""
+        path = os.path.join(output_dir, TIMINGS_FILENAME)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=4)
+        if self.sink is not None:
+            try:
+                self.sink(report)
+            except Exception as e:
+                # A broken metrics sink must not fail the analysis itself.
+                print(f"Metrics sink failed: {e}")
+        return path
+
+
+def _sample_rss(profiler_ref, stopped):
+    while not stopped.wait(RSS_SAMPLE_SECONDS):
+        profiler = profiler_ref()
+        if profiler is None:
+            return
+        profiler._record_rss()
+        del profiler
+
+
+def current_rss_bytes():
+    """Resident memory of this process right now (Linux /proc), or None where that is not available."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_bytes():
+    """Peak resident memory of this process over its lifetime (and of its largest finished child), or None."""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    unit = 1 if os.uname().sysname == 'Darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit
+    return max(own, children)
+
+
+class JsonlSink:
+    """A local metrics sink: appends each run's report as one JSON line (e.g. for a log shipper)."""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, report):
+        line = json.dumps(dict(report, timestamp=time.time())) + "\n"
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
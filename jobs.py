@@ -0,0 +1,175 @@
+import collections
+import itertools
+import os
+import threading
+import time
+import traceback
+
+from analysis_module import analyze_video
+
+# Share of a job's progress bar given to each pass over the video.
+STAGE_WEIGHTS = {"analysis": 0.6, "render": 0.4}
+
+
+class QueueFullError(RuntimeError):
+    """Raised by JobScheduler.submit when every worker is busy and the wait queue is full."""
+
+
+class Job:
+    """One queued analysis and its live status."""
+    def __init__(self, job_id, video_path, run_bonus_features, video_info=None, delete_input=False):
+        self.id = job_id
+        self.video_path = video_path
+        self.video_info = video_info
+        # The input is a temp copy made for this job (e.g. an app upload) and is deleted once the job finishes.
+        self.delete_input = delete_input
+        self.run_bonus_features = run_bonus_features
+        self.state = "queued"
+        self.stage = ""
+        self.progress = 0.0
+        self.results = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def _on_progress(self, stage, frames_done, frame_count):
+        # The container's frame count can be missing or slightly off, so clamp to [0, 1].
+        fraction = min(frames_done / frame_count, 1.0) if frame_count else 0.0
+        offset = 0.0
+        for name, weight in STAGE_WEIGHTS.items():
+            if name == stage:
+                self.stage = stage
+                self.progress = max(self.progress, offset + weight * fraction)
+                return
+            offset += weight
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed")
+
+
+class JobScheduler:
+    """
+    Runs analyze_video jobs on a fixed pool of background threads, in submission order.
+
+    Admission control: at most `workers` jobs run at once and `max_queued` more may
+    wait; beyond that submit() raises QueueFullError instead of letting work pile
+    up. Jobs report their queue position while waiting and a progress fraction
+    driven by frames processed while running. Everything is in-process, so no
+    broker is needed; finished jobs are kept (up to `keep_finished`) for polling.
+    """
+    def __init__(self, workers=2, max_queued=8, cache=None, keep_finished=100):
+        self.workers = max(int(workers), 1)
+        self.max_queued = max(int(max_queued), 0)
+        self.cache = cache
+        self.keep_finished = keep_finished
+        self._jobs = collections.OrderedDict()
+        self._queue = collections.deque()
+        self._running = 0
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, name=f"analysis-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @classmethod
+    def from_config(cls, config, cache=None):
+        jobs = config.get('jobs', {})
+        return cls(jobs.get('workers', 2), jobs.get('max_queued', 8), cache, jobs.get('keep_finished', 100))
+
+    def submit(self, video_path, run_bonus_features=False, video_info=None, delete_input=False):
+        """
+        Queues an analysis and returns its Job; raises QueueFullError if the scheduler is saturated.
+
+        `video_info` is the video's header metadata (pipeline.probe_video), if the caller already has it.
+        With `delete_input`, the job takes ownership of video_path and removes it when it finishes.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            if self._running + len(self._queue) >= self.workers + self.max_queued:
+                raise QueueFullError(f"{self._running} analyses running and {len(self._queue)} waiting")
+            job = Job(f"job-{next(self._ids)}", video_path, run_bonus_features, video_info, delete_input)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id):
+        """A snapshot for polling UIs: state, queue position (1 = next), stage, progress, results or error."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            position = 0
+            if job.state == "queued":
+                position = next(i for i, queued in enumerate(self._queue, start=1) if queued is job)
+            return {
+                'id': job.id,
+                'state': job.state,
+                'position': position,
+                'stage': job.stage,
+                'progress': round(job.progress, 3),
+                'results': job.results,
+                'error': job.error,
+                'run_bonus_features': job.run_bonus_features,
+                'elapsed_seconds': round((job.finished_at or time.time()) - job.started_at, 1) if job.started_at else 0.0,
+            }
+
+    def load(self):
+        """How busy the scheduler is: running and waiting job counts."""
+        with self._cond:
+            return {'running': self._running, 'queued': len(self._queue), 'workers': self.workers, 'max_queued': self.max_queued}
+
+    def shutdown(self, wait=True):
+        """Stops accepting jobs; queued jobs still run. With `wait`, blocks until all are done."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                job = self._queue.popleft()
+                job.state = "running"
+                job.started_at = time.time()
+                self._running += 1
+            try:
+                results = analyze_video(job.video_path, run_bonus_features=job.run_bonus_features,
+                                        cache=self.cache, progress_callback=job._on_progress,
+                                        video_info=job.video_info)
+                if not results:
+                    raise RuntimeError("No pose was detected in the video.")
+                job.results, job.state, job.progress = results, "done", 1.0
+            except Exception as e:
+                traceback.print_exc()
+                job.error, job.state = str(e), "failed"
+            finally:
+                if job.delete_input:
+                    try:
+                        os.remove(job.video_path)
+                    except OSError:
+                        pass
+                with self._cond:
+                    job.finished_at = time.time()
+                    self._running -= 1
+                    self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.keep_finished, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,101 @@
+import numpy as np
+
+NUM_LANDMARKS = 33
+# Each landmark is stored as (x, y, z, visibility), with x/y normalized to the frame size.
+LANDMARK_FIELDS = 4
+
+
+def landmarks_to_array(landmarks):
+    """Packs a MediaPipe landmark list into a (33, 4) float32 array."""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+
+class LandmarkStore:
+    """
+    A compact, frame-indexed store of the pose landmarks found in a video.
+
+    The first pass fills it once so later stages (overlays, bonus analytics)
+    never need to run pose inference on the same frame again.
+    """
+    def __init__(self, capacity=0):
+        capacity = max(int(capacity), 1)
+        self._landmarks = np.zeros((capacity, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        self._detected = np.zeros(capacity, dtype=bool)
+        # Frames whose landmarks were interpolated rather than produced by pose inference.
+        self._interpolated = np.zeros(capacity, dtype=bool)
+        self.frame_count = 0
+
+    def _ensure_capacity(self, size):
+        capacity = len(self._detected)
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        landmarks = np.zeros((new_capacity, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        landmarks[:capacity] = self._landmarks
+        detected = np.zeros(new_capacity, dtype=bool)
+        detected[:capacity] = self._detected
+        interpolated = np.zeros(new_capacity, dtype=bool)
+        interpolated[:capacity] = self._interpolated
+        self._landmarks, self._detected, self._interpolated = landmarks, detected, interpolated
+
+    def set(self, frame_index, landmarks, interpolated=False):
+        """Stores the landmarks for a frame; `None` marks the frame as having no detection."""
+        self._ensure_capacity(frame_index + 1)
+        self._interpolated[frame_index] = interpolated and landmarks is not None
+        if landmarks is None:
+            self._detected[frame_index] = False
+        else:
+            if not isinstance(landmarks, np.ndarray):
+                landmarks = landmarks_to_array(landmarks)
+            self._landmarks[frame_index] = landmarks
+            self._detected[frame_index] = True
+        self.frame_count = max(self.frame_count, frame_index + 1)
+
+    def set_range(self, start, landmarks, detected, interpolated=False):
+        """Bulk-stores a contiguous block of frames beginning at `start`."""
+        end = start + len(detected)
+        self._ensure_capacity(end)
+        self._landmarks[start:end] = landmarks
+        self._detected[start:end] = detected
+        self._interpolated[start:end] = np.asarray(interpolated, dtype=bool) & self._detected[start:end]
+        self.frame_count = max(self.frame_count, end)
+
+    def append(self, landmarks):
+        """Stores the landmarks for the next frame and returns its frame index."""
+        frame_index = self.frame_count
+        self.set(frame_index, landmarks)
+        return frame_index
+
+    def get(self, frame_index):
+        """Returns the (33, 4) landmark array for a frame, or None if nothing was detected."""
+        if frame_index >= self.frame_count or not self._detected[frame_index]:
+            return None
+        return self._landmarks[frame_index]
+
+    @property
+    def landmarks(self):
+        return self._landmarks[:self.frame_count]
+
+    @property
+    def detected(self):
+        return self._detected[:self.frame_count]
+
+    @property
+    def interpolated(self):
+        return self._interpolated[:self.frame_count]
+
+    def detected_frame_indices(self):
+        """Video frame numbers that have landmarks, in order."""
+        return np.flatnonzero(self.detected)
+
+    def to_landmark_list(self, frame_index):
+        """Rebuilds a MediaPipe NormalizedLandmarkList for a frame, for use with drawing_utils."""
+        from mediapipe.framework.formats import landmark_pb2
+
+        landmarks = self.get(frame_index)
+        if landmarks is None:
+            return None
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in landmarks.tolist():
+            landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+        return landmark_list
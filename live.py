@@ -0,0 +1,232 @@
+import collections
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from analysis_module import PoseAnalyzer, create_run_dir
+from landmark_store import LandmarkStore
+from metrics_engine import compute_landmark_metrics
+from roi import detect_landmarks
+
+_END = object()
+
+
+class ReplaySource:
+    """
+    Replays a local video file at its native frame rate, as a stand-in for a camera.
+
+    Yields (frame_index, frame, capture_time) where capture_time is when a camera
+    would have taken the frame. Like a camera, it does not wait for a slow reader:
+    if decoding falls more than a frame behind schedule, frames are skipped.
+    """
+    def __init__(self, video_path, speed=1.0):
+        self.video_path = video_path
+        self.speed = float(speed)
+        self.skipped = 0
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        interval = 1.0 / (fps * self.speed)
+        start = time.perf_counter()
+        frame_index = 0
+        try:
+            while cap.isOpened():
+                due = start + frame_index * interval
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif -delay > interval:
+                    # More than a frame late: drop this one at the "sensor", as a camera would.
+                    if not cap.grab(): break
+                    self.skipped += 1
+                    frame_index += 1
+                    continue
+                ret, frame = cap.read()
+                if not ret: break
+                yield frame_index, frame, due
+                frame_index += 1
+        finally:
+            cap.release()
+
+
+def timed_frames(source):
+    """
+    Normalizes a frame source into (frame_index, frame, capture_time) items.
+
+    Accepts a cv2.VideoCapture, a camera index or stream URL, a local file path
+    (replayed at its native fps), a ReplaySource, or any iterable of frames or
+    (frame_index, frame) pairs; frames without a capture time are stamped when they
+    arrive. Sources that run faster than real time (e.g. a cv2.VideoCapture opened
+    on a file) overflow the buffer, so most of their frames are dropped.
+    """
+    if isinstance(source, str) and os.path.isfile(source):
+        source = ReplaySource(source)
+    elif isinstance(source, (str, int)):
+        cap = cv2.VideoCapture(source)
+        try:
+            yield from timed_frames(cap)
+        finally:
+            cap.release()
+        return
+    if isinstance(source, cv2.VideoCapture):
+        frame_index = 0
+        while source.isOpened():
+            ret, frame = source.read()
+            if not ret: break
+            yield frame_index, frame, time.perf_counter()
+            frame_index += 1
+        return
+    for frame_index, item in enumerate(source):
+        if isinstance(item, tuple):
+            if len(item) == 3:
+                yield item
+                continue
+            frame_index, item = item
+        yield frame_index, item, time.perf_counter()
+
+
+class LiveAnalyzer:
+    """
+    Runs pose, metrics and feedback overlays on a live frame source within a latency budget.
+
+    A reader thread pulls frames from the source into a small buffer (the oldest
+    frame is dropped when it is full). A frame is skipped without inference if,
+    given its age and the recent per-frame processing time, it could not be shown
+    within `latency_budget_ms` of capture and a newer frame is already waiting.
+    Every processed frame is annotated with `_generate_feedback` and handed to
+    `on_frame`; end-to-end latency (capture to `on_frame` returning) is tracked as
+    p50/p95/p99.
+    """
+    def __init__(self, output_dir='output', config=None, latency_budget_ms=None):
+        self.analyzer = PoseAnalyzer("live", run_dir=create_run_dir(output_dir, "live"), config=config)
+        self.analyzer.landmark_store = LandmarkStore(1)
+        live = self.analyzer.config.get('live', {})
+        self.latency_budget_ms = latency_budget_ms if latency_budget_ms is not None else live.get('latency_budget_ms', 200)
+        self.buffer_frames = max(int(live.get('buffer_frames', 2)), 1)
+        self.stats_interval_seconds = live.get('stats_interval_seconds', 5)
+        self._latencies = collections.deque(maxlen=int(live.get('latency_window_frames', 10000)))
+        self._buffer = collections.deque()
+        self._ready = threading.Condition()
+        self._stop = threading.Event()
+        self._processing_seconds = 0.0
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.dropped_buffer = 0
+        self.dropped_late = 0
+        self._started = None
+
+    def stop(self):
+        """Asks a running `run` to finish after the current frame."""
+        self._stop.set()
+        with self._ready:
+            self._ready.notify_all()
+
+    def _read(self, source):
+        try:
+            for item in timed_frames(source):
+                if self._stop.is_set():
+                    break
+                with self._ready:
+                    if len(self._buffer) >= self.buffer_frames:
+                        self._buffer.popleft()
+                        self.dropped_buffer += 1
+                    self._buffer.append(item)
+                    self.frames_received += 1
+                    self._ready.notify()
+        finally:
+            with self._ready:
+                self._buffer.append(_END)
+                self._ready.notify()
+
+    def _next(self):
+        with self._ready:
+            while not self._buffer and not self._stop.is_set():
+                self._ready.wait(0.1)
+            return self._buffer.popleft() if self._buffer else _END
+
+    def _annotate(self, frame):
+        analyzer = self.analyzer
+        frame_height, frame_width = frame.shape[:2]
+        landmarks = detect_landmarks(analyzer.pose, frame, analyzer.inference_region)
+        analyzer.inference_calls += 1
+        metrics = compute_landmark_metrics(landmarks, frame_width, frame_height) if landmarks is not None else None
+        feedback = {}
+        if metrics is not None:
+            feedback = analyzer._generate_feedback(metrics)
+            # Only the current frame is kept: the store is a single reusable slot.
+            analyzer.landmark_store.set(0, landmarks)
+            analyzer._draw_overlays(frame, metrics, feedback, 0)
+        return metrics, feedback
+
+    def run(self, source, on_frame=None, on_stats=None):
+        """
+        Processes `source` until it ends or `stop()` is called; returns the final stats.
+
+        `on_frame(frame_index, annotated_frame, metrics, feedback)` receives every
+        processed frame (e.g. to display or record it). `on_stats(stats)` is called
+        every `stats_interval_seconds` and once at the end; the final stats are also
+        written to live_stats.json.
+        """
+        self._stop.clear()
+        self._started = time.perf_counter()
+        reader = threading.Thread(target=self._read, args=(source,), name="live-reader", daemon=True)
+        reader.start()
+        next_stats = self._started + self.stats_interval_seconds
+        budget = self.latency_budget_ms / 1000.0
+        try:
+            while not self._stop.is_set():
+                item = self._next()
+                if item is _END:
+                    break
+                frame_index, frame, captured = item
+                start = time.perf_counter()
+                # Skip a frame that would miss the budget, but only in favor of a newer one already waiting.
+                newer_waiting = bool(self._buffer) and self._buffer[0] is not _END
+                if start - captured + self._processing_seconds > budget and newer_waiting:
+                    self.dropped_late += 1
+                    continue
+                metrics, feedback = self._annotate(frame)
+                if on_frame is not None:
+                    on_frame(frame_index, frame, metrics, feedback)
+                done = time.perf_counter()
+                # Smoothed processing time, used to predict whether the next frame can make the budget.
+                self._processing_seconds = 0.8 * self._processing_seconds + 0.2 * (done - start) if self.frames_processed else done - start
+                self._latencies.append(done - captured)
+                self.frames_processed += 1
+                if on_stats is not None and done >= next_stats:
+                    on_stats(self.stats())
+                    next_stats = done + self.stats_interval_seconds
+        finally:
+            self.stop()
+            reader.join(timeout=1.0)
+            self.analyzer._close_pose()
+        stats = self.stats()
+        with open(os.path.join(self.analyzer.output_dir, 'live_stats.json'), 'w') as f:
+            json.dump(stats, f, indent=4)
+        if on_stats is not None:
+            on_stats(stats)
+        return stats
+
+    def stats(self):
+        """Frame counts, drops and end-to-end latency percentiles (ms) so far."""
+        latencies = np.array(self._latencies) * 1000.0
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        percentiles = {}
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            percentiles = {'p50': round(float(p50), 1), 'p95': round(float(p95), 1), 'p99': round(float(p99), 1),
+                           'max': round(float(latencies.max()), 1)}
+        return {
+            'latency_budget_ms': self.latency_budget_ms,
+            'frames_received': self.frames_received,
+            'frames_processed': self.frames_processed,
+            'dropped_buffer': self.dropped_buffer,
+            'dropped_late': self.dropped_late,
+            'processed_fps': round(self.frames_processed / elapsed, 1) if elapsed else 0.0,
+            'latency_ms': percentiles,
+        }
@@ -0,0 +1,111 @@
+import numpy as np
+
+# MediaPipe Pose landmark indices used by the metrics (mp.solutions.pose.PoseLandmark values).
+NOSE = 0
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_ELBOW = 13
+LEFT_WRIST = 15
+LEFT_HIP = 23
+RIGHT_HIP = 24
+LEFT_KNEE = 25
+LEFT_HEEL = 29
+LEFT_FOOT_INDEX = 31
+
+
+def calculate_angle(a, b, c):
+    """Angle ABC in degrees (0-180) for a single frame."""
+    a = np.array(a); b = np.array(b); c = np.array(c)
+    radians = np.arctan2(c[1] - b[1], c[0] - b[0]) - np.arctan2(a[1] - b[1], a[0] - b[0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    if angle > 180.0:
+        angle = 360 - angle
+    return angle
+
+
+def compute_frame_metrics(landmarks, frame_width, frame_height):
+    """Per-frame metrics from a MediaPipe landmark list. Returns None if the landmarks are unusable."""
+    metrics = {}
+    try:
+        def point(index):
+            return [landmarks[index].x * frame_width, landmarks[index].y * frame_height]
+
+        shoulder_l = point(LEFT_SHOULDER)
+        shoulder_r = point(RIGHT_SHOULDER)
+        elbow = point(LEFT_ELBOW)
+        wrist = point(LEFT_WRIST)
+        hip_l = point(LEFT_HIP)
+        hip_r = point(RIGHT_HIP)
+        nose = point(NOSE)
+        knee = point(LEFT_KNEE)
+        heel = point(LEFT_HEEL)
+        foot_index = point(LEFT_FOOT_INDEX)
+
+        hip_midpoint = [(hip_l[0] + hip_r[0]) / 2, (hip_l[1] + hip_r[1]) / 2]
+
+        metrics['front_elbow_angle'] = calculate_angle(shoulder_l, elbow, wrist)
+        shoulder_midpoint = [(shoulder_l[0] + shoulder_r[0]) / 2, (shoulder_l[1] + shoulder_r[1]) / 2]
+        metrics['spine_lean'] = calculate_angle(hip_midpoint, shoulder_midpoint, [shoulder_midpoint[0], hip_midpoint[1]])
+        shoulder_width = abs(shoulder_l[0] - shoulder_r[0])
+        metrics['head_knee_alignment'] = abs(nose[0] - knee[0]) / shoulder_width if shoulder_width > 0 else 0
+        metrics['front_foot_direction'] = calculate_angle([heel[0] + 100, heel[1]], heel, foot_index)
+        metrics['wrist_y_coords'] = wrist[1]
+        metrics['hip_y_coords'] = hip_midpoint[1]
+
+    except Exception as e:
+        print(f"Error calculating metrics: {e}")
+        return None
+    return metrics
+
+
+def _batch_angle(a, b, c):
+    """Vectorized `calculate_angle` over (N, 2) point arrays."""
+    radians = np.arctan2(c[:, 1] - b[:, 1], c[:, 0] - b[:, 0]) - np.arctan2(a[:, 1] - b[:, 1], a[:, 0] - b[:, 0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    return np.where(angle > 180.0, 360 - angle, angle)
+
+
+def compute_metrics_batch(landmarks, valid, frame_width, frame_height):
+    """
+    Computes every per-frame metric for a whole video at once.
+
+    `landmarks` is an (N, 33, 2+) array of normalized landmark coordinates and
+    `valid` an (N,) bool mask of frames with a detection. Returns a dict of
+    (N,) float64 metric columns (NaN where invalid) and the validity mask.
+    """
+    valid = np.asarray(valid, dtype=bool)
+    points = np.asarray(landmarks, dtype=np.float64)[:, :, :2] * np.array([frame_width, frame_height], dtype=np.float64)
+
+    shoulder_l = points[:, LEFT_SHOULDER]
+    shoulder_r = points[:, RIGHT_SHOULDER]
+    hip_midpoint = (points[:, LEFT_HIP] + points[:, RIGHT_HIP]) / 2
+    shoulder_midpoint = (shoulder_l + shoulder_r) / 2
+    heel = points[:, LEFT_HEEL]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        metrics = {}
+        metrics['front_elbow_angle'] = _batch_angle(shoulder_l, points[:, LEFT_ELBOW], points[:, LEFT_WRIST])
+        spine_reference = np.stack([shoulder_midpoint[:, 0], hip_midpoint[:, 1]], axis=1)
+        metrics['spine_lean'] = _batch_angle(hip_midpoint, shoulder_midpoint, spine_reference)
+        shoulder_width = np.abs(shoulder_l[:, 0] - shoulder_r[:, 0])
+        head_knee_distance = np.abs(points[:, NOSE, 0] - points[:, LEFT_KNEE, 0])
+        metrics['head_knee_alignment'] = np.divide(head_knee_distance, shoulder_width,
+                                                   out=np.zeros_like(shoulder_width), where=shoulder_width > 0)
+        heel_reference = heel + np.array([100.0, 0.0])
+        metrics['front_foot_direction'] = _batch_angle(heel_reference, heel, points[:, LEFT_FOOT_INDEX])
+        metrics['wrist_y_coords'] = points[:, LEFT_WRIST, 1].copy()
+        metrics['hip_y_coords'] = hip_midpoint[:, 1].copy()
+
+    # Frames without a detection (or with non-finite landmarks) are masked out.
+    valid = valid & np.all(np.isfinite(points), axis=(1, 2))
+    for column in metrics.values():
+        column[~valid] = np.nan
+    return metrics, valid
+
+
+def compute_landmark_metrics(landmarks, frame_width, frame_height):
+    """Metrics dict (Python floats) for one frame's (33, 4) landmark array, or None if unusable."""
+    metrics, valid = compute_metrics_batch(np.asarray(landmarks)[np.newaxis], [True], frame_width, frame_height)
+    if not valid[0]:
+        return None
+    return {name: float(column[0]) for name, column in metrics.items()}
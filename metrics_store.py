@@ -0,0 +1,138 @@
+import numpy as np
+
+METRIC_NAMES = (
+    'front_elbow_angle', 'spine_lean',
+    'head_knee_alignment', 'front_foot_direction',
+    'wrist_y_coords', 'hip_y_coords'
+)
+
+
+class MetricsStore:
+    """
+    Frame-indexed, columnar storage for the per-frame metrics of a video.
+
+    Every metric is a preallocated float32 column indexed by video frame number,
+    with a shared validity mask for frames where no pose (or no metrics) was found.
+    Invalid entries hold NaN so column views can be plotted directly.
+    """
+    def __init__(self, capacity=0, names=METRIC_NAMES):
+        capacity = max(int(capacity), 1)
+        self.names = tuple(names)
+        self._columns = {name: np.full(capacity, np.nan, dtype=np.float32) for name in self.names}
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._interpolated = np.zeros(capacity, dtype=bool)
+        self.frame_count = 0
+
+    def _ensure_capacity(self, size):
+        capacity = len(self._valid)
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2)
+        for name, column in self._columns.items():
+            grown = np.full(new_capacity, np.nan, dtype=np.float32)
+            grown[:capacity] = column
+            self._columns[name] = grown
+        valid = np.zeros(new_capacity, dtype=bool)
+        valid[:capacity] = self._valid
+        self._valid = valid
+        interpolated = np.zeros(new_capacity, dtype=bool)
+        interpolated[:capacity] = self._interpolated
+        self._interpolated = interpolated
+
+    def set(self, frame_index, metrics):
+        """Stores the metrics dict for a frame; `None` marks the frame as invalid."""
+        self._ensure_capacity(frame_index + 1)
+        if metrics is None:
+            self._valid[frame_index] = False
+            for column in self._columns.values():
+                column[frame_index] = np.nan
+        else:
+            for name, column in self._columns.items():
+                column[frame_index] = metrics.get(name, np.nan)
+            self._valid[frame_index] = True
+        self.frame_count = max(self.frame_count, frame_index + 1)
+
+    def assign(self, columns, valid, interpolated=None):
+        """
+        Bulk-loads whole metric columns (e.g. from metrics_engine.compute_metrics_batch).
+        `interpolated` flags valid frames whose landmarks were interpolated, not inferred.
+        """
+        valid = np.asarray(valid, dtype=bool)
+        frame_count = len(valid)
+        self._ensure_capacity(frame_count)
+        for name, column in self._columns.items():
+            column[:frame_count] = columns[name]
+            column[:frame_count][~valid] = np.nan
+        self._valid[:frame_count] = valid
+        self._interpolated[:frame_count] = valid & (np.asarray(interpolated, dtype=bool) if interpolated is not None else False)
+        self.frame_count = max(self.frame_count, frame_count)
+
+    def __len__(self):
+        return self.frame_count
+
+    def __getitem__(self, name):
+        """Zero-copy view of a metric column over all frames (NaN where invalid)."""
+        return self._columns[name][:self.frame_count]
+
+    def get(self, name, default=None):
+        if name not in self._columns:
+            return default
+        return self[name]
+
+    def keys(self):
+        return self._columns.keys()
+
+    @property
+    def valid(self):
+        return self._valid[:self.frame_count]
+
+    @property
+    def valid_count(self):
+        return int(self.valid.sum())
+
+    def valid_frame_indices(self):
+        """Video frame numbers that have metrics, in order."""
+        return np.flatnonzero(self.valid)
+
+    def valid_values(self, name):
+        """The valid entries of a metric column as float64, in frame order."""
+        return self[name][self.valid].astype(np.float64)
+
+    @property
+    def interpolated(self):
+        return self._interpolated[:self.frame_count]
+
+    def observed_values(self, name):
+        """Like valid_values, but only frames where pose inference actually ran."""
+        return self[name][self.valid & ~self.interpolated].astype(np.float64)
+
+    def observed_weights(self):
+        """
+        How many valid frames each observed_values entry stands for: every valid frame is
+        counted towards its nearest inferred frame (ties go to the earlier one). Without
+        interpolation every weight is 1; in adaptive mode a coarse sample counts for the
+        stride around it, so the dense window around impact is not over-weighted.
+        """
+        observed = np.flatnonzero(self.valid & ~self.interpolated)
+        valid_frames = np.flatnonzero(self.valid)
+        if len(observed) == 0:
+            return np.zeros(0, dtype=np.int64)
+        right = np.clip(np.searchsorted(observed, valid_frames), 0, len(observed) - 1)
+        left = np.clip(right - 1, 0, len(observed) - 1)
+        nearest = np.where(np.abs(valid_frames - observed[left]) <= np.abs(observed[right] - valid_frames), left, right)
+        return np.bincount(nearest, minlength=len(observed))
+
+    def is_valid(self, frame_index):
+        return 0 <= frame_index < self.frame_count and bool(self._valid[frame_index])
+
+    def value(self, name, frame_index):
+        """A single metric value as a Python float, or None for an invalid frame."""
+        if not self.is_valid(frame_index):
+            return None
+        return float(self._columns[name][frame_index])
+
+    def row(self, frame_index):
+        """All metrics for one frame as a dict of floats, or None for an invalid frame."""
+        if not self.is_valid(frame_index):
+            return None
+        return {name: float(column[frame_index]) for name, column in self._columns.items()}
@@ -0,0 +1,116 @@
+import cv2
+import numpy as np
+
+# Same look as mp_drawing.draw_landmarks with the specs the analyzer has always used.
+LANDMARK_COLOR = (245, 117, 66)
+CONNECTION_COLOR = (245, 66, 230)
+LANDMARK_BORDER_COLOR = (224, 224, 224)
+SKELETON_THICKNESS = 2
+CIRCLE_RADIUS = 2
+VISIBILITY_THRESHOLD = 0.5
+# mp.solutions.pose.POSE_CONNECTIONS, sorted; spelled out so drawing does not import MediaPipe.
+POSE_CONNECTIONS = np.array([
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10), (11, 12), (11, 13), (11, 23),
+    (12, 14), (12, 24), (13, 15), (14, 16), (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22),
+    (17, 19), (18, 20), (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (27, 31), (28, 30),
+    (28, 32), (29, 31), (30, 32),
+], dtype=np.int32)
+
+DASHBOARD_HEIGHT = 220
+DASHBOARD_WIDTH = 450
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+# addWeighted(panel, 0.5, gray(50), 0.5, 1.0) == 0.5 * panel + 26, with the same rounding.
+DASHBOARD_ALPHA = 0.5
+DASHBOARD_BETA = 26
+
+
+def _joint_stamp():
+    # One joint as draw_landmarks paints it (white-ish ring, then colored disc), rasterized
+    # once: pixel offsets from the joint center and which color each ends up with.
+    border_radius = max(CIRCLE_RADIUS + 1, int(CIRCLE_RADIUS * 1.2))
+    center = border_radius + SKELETON_THICKNESS
+    canvas = np.zeros((2 * center + 1, 2 * center + 1), dtype=np.uint8)
+    cv2.circle(canvas, (center, center), border_radius, 1, SKELETON_THICKNESS)
+    cv2.circle(canvas, (center, center), CIRCLE_RADIUS, 2, SKELETON_THICKNESS)
+    rows, cols = np.nonzero(canvas)
+    return rows - center, cols - center, canvas[rows, cols] - 1
+
+JOINT_DY, JOINT_DX, JOINT_COLOR_INDEX = _joint_stamp()
+JOINT_STAMP_REACH = int(max(np.abs(JOINT_DY).max(), np.abs(JOINT_DX).max())) + 1
+JOINT_COLORS = np.array([LANDMARK_BORDER_COLOR, LANDMARK_COLOR], dtype=np.uint8)
+
+
+class OverlayRenderer:
+    """
+    Draws the skeleton and feedback dashboard onto video frames.
+
+    Produces the same pixels as drawing_utils.draw_landmarks plus cv2.addWeighted,
+    but without rebuilding a MediaPipe landmark proto or a gray layer per frame:
+    the skeleton is drawn straight from a (33, 4) landmark array (all joints in one
+    vectorized write of a pre-rasterized joint stamp) and the dashboard panel is
+    darkened in place with a single scale-and-offset.
+    """
+
+    def draw(self, frame, landmarks, metrics, feedback, current_phase=""):
+        """Skeleton, dashboard and metric/feedback text for one frame, drawn in place."""
+        if landmarks is not None:
+            self.draw_skeleton(frame, landmarks)
+        frame_height = frame.shape[0]
+        dashboard_start_y = frame_height - DASHBOARD_HEIGHT
+        self.draw_dashboard(frame, dashboard_start_y)
+
+        if current_phase:
+            cv2.putText(frame, f"Phase: {current_phase}", (10, dashboard_start_y + 30), FONT, 0.9, (255, 255, 0), 2)
+
+        text_start_y = dashboard_start_y + 70
+        if 'front_elbow_angle' in metrics: cv2.putText(frame, f"Elbow Angle: {int(metrics['front_elbow_angle'])} deg", (10, text_start_y), FONT, 0.8, (255, 255, 255), 2)
+        if 'spine_lean' in metrics: cv2.putText(frame, f"Spine Lean: {int(metrics['spine_lean'])} deg", (10, text_start_y + 40), FONT, 0.8, (255, 255, 255), 2)
+        if 'head_knee_alignment' in metrics: cv2.putText(frame, f"Head Align: {metrics['head_knee_alignment']:.2f} (ratio)", (10, text_start_y + 80), FONT, 0.8, (255, 255, 255), 2)
+        if 'elbow' in feedback: cv2.putText(frame, feedback['elbow'][0], (10, text_start_y + 120), FONT, 0.8, feedback['elbow'][1], 2)
+        if 'head' in feedback: cv2.putText(frame, feedback['head'][0], (10, text_start_y + 150), FONT, 0.8, feedback['head'][1], 2)
+        return frame
+
+    def draw_skeleton(self, frame, landmarks):
+        """Draws pose connections and joints from a (33, 4) array of normalized landmarks."""
+        frame_height, frame_width = frame.shape[:2]
+        x = landmarks[:, 0].astype(np.float64)
+        y = landmarks[:, 1].astype(np.float64)
+        # Landmarks that are hidden or outside the frame are skipped, as draw_landmarks does.
+        shown = (landmarks[:, 3] >= VISIBILITY_THRESHOLD) & (x >= 0) & (x <= 1) & (y >= 0) & (y <= 1)
+        points = np.zeros((len(landmarks), 2), dtype=np.int32)
+        points[shown, 0] = np.minimum(np.floor(x[shown] * frame_width), frame_width - 1)
+        points[shown, 1] = np.minimum(np.floor(y[shown] * frame_height), frame_height - 1)
+
+        connected = shown[POSE_CONNECTIONS].all(axis=1)
+        if connected.any():
+            cv2.polylines(frame, list(points[POSE_CONNECTIONS[connected]]), False, CONNECTION_COLOR, SKELETON_THICKNESS)
+        self._draw_joints(frame, points[shown])
+        return frame
+
+    def _draw_joints(self, frame, centers):
+        frame_height, frame_width = frame.shape[:2]
+        reach = JOINT_STAMP_REACH
+        if len(centers) and (centers.min() < reach or centers[:, 0].max() >= frame_width - reach
+                             or centers[:, 1].max() >= frame_height - reach):
+            # OpenCV clips circles at the frame edge slightly differently than a cut-off stamp.
+            border_radius = max(CIRCLE_RADIUS + 1, int(CIRCLE_RADIUS * 1.2))
+            for point in centers.tolist():
+                point = tuple(point)
+                cv2.circle(frame, point, border_radius, LANDMARK_BORDER_COLOR, SKELETON_THICKNESS)
+                cv2.circle(frame, point, CIRCLE_RADIUS, LANDMARK_COLOR, SKELETON_THICKNESS)
+            return frame
+        ys = (centers[:, 1:2] + JOINT_DY).ravel()
+        xs = (centers[:, 0:1] + JOINT_DX).ravel()
+        colors = np.tile(JOINT_COLOR_INDEX, len(centers))
+        # Where joints overlap, the one drawn last wins, as with one cv2.circle call per joint.
+        flat = ys * frame_width + xs
+        _, last = np.unique(flat[::-1], return_index=True)
+        last = len(flat) - 1 - last
+        frame[ys[last], xs[last]] = JOINT_COLORS[colors[last]]
+        return frame
+
+    def draw_dashboard(self, frame, dashboard_start_y):
+        """Darkens the dashboard panel in the bottom-left corner."""
+        region = frame[dashboard_start_y:frame.shape[0], 0:DASHBOARD_WIDTH]
+        cv2.convertScaleAbs(region, dst=region, alpha=DASHBOARD_ALPHA, beta=DASHBOARD_BETA)
+        return frame
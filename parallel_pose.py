@@ -0,0 +1,85 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from landmark_store import LandmarkStore, NUM_LANDMARKS, LANDMARK_FIELDS
+from roi import InferenceRegion, detect_landmarks
+
+
+def plan_shards(frame_count, workers, min_shard_frames=60):
+    """Splits [0, frame_count) into contiguous (start, end) frame ranges, one per worker at most."""
+    if frame_count <= 0:
+        return [(0, None)]
+    shard_count = max(1, min(workers, frame_count // max(min_shard_frames, 1)))
+    bounds = np.linspace(0, frame_count, shard_count + 1).astype(int)
+    shards = [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+    # The container's frame count is only an estimate, so the last shard reads to the end of the file.
+    shards[-1] = (shards[-1][0], None)
+    return shards
+
+
+def _extract_shard(video_path, start, end, warmup_frames, pose_options, inference_options=None):
+    """Runs pose on frames [start, end) of a video in a worker process with its own Pose graph."""
+    import mediapipe as mp
+
+    region = InferenceRegion(**(inference_options or {}))
+    read_start = max(0, start - warmup_frames)
+    cap = cv2.VideoCapture(video_path)
+    if read_start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, read_start)
+    capacity = (end - start) if end is not None else 0
+    landmarks = np.zeros((max(capacity, 1), NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    detected = np.zeros(max(capacity, 1), dtype=bool)
+
+    with mp.solutions.pose.Pose(**pose_options) as pose:
+        frame_idx = read_start
+        while cap.isOpened() and (end is None or frame_idx < end):
+            ret, frame = cap.read()
+            if not ret: break
+            frame_landmarks = detect_landmarks(pose, frame, region)
+            # Warm-up frames only prime MediaPipe's tracker; their results are owned by the previous shard.
+            if frame_idx >= start:
+                offset = frame_idx - start
+                # Grown for every frame, missed ones included: an open-ended last shard starts with room for one.
+                if offset >= len(detected):
+                    grow = max(offset + 1, 2 * len(detected)) - len(detected)
+                    landmarks = np.concatenate([landmarks, np.zeros((grow,) + landmarks.shape[1:], dtype=landmarks.dtype)])
+                    detected = np.concatenate([detected, np.zeros(grow, dtype=bool)])
+                if frame_landmarks is not None:
+                    landmarks[offset] = frame_landmarks
+                    detected[offset] = True
+            frame_idx += 1
+    cap.release()
+    frames_read = max(0, frame_idx - start)
+    return start, landmarks[:frames_read], detected[:frames_read]
+
+
+def process_pool(workers, initializer=None):
+    """A process pool for pose work, shared with batch.py."""
+    # 'spawn' keeps workers from inheriting the parent's MediaPipe/OpenCV thread state.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=initializer)
+
+
+def extract_landmarks_parallel(video_path, frame_count, workers, pose_options, overlap_frames=30, inference_options=None):
+    """
+    Runs pose extraction on frame-range shards of a video across worker processes.
+
+    Each shard decodes `overlap_frames` frames before its start as a warm-up window
+    so tracking has settled by the time its own frames begin. Results are merged
+    back into a single LandmarkStore in frame order. MediaPipe's smoothing state
+    differs slightly after each seam, so landmarks are close to, but not
+    bit-identical with, the serial path. `inference_options` are InferenceRegion
+    arguments (scale, max_side, use_roi, roi_padding) applied in every worker.
+    """
+    shards = plan_shards(frame_count, workers, min_shard_frames=max(2 * overlap_frames, 1))
+    print(f"Extracting landmarks in {len(shards)} shard(s) with {workers} worker(s)...")
+    store = LandmarkStore(frame_count)
+    with process_pool(min(workers, len(shards))) as executor:
+        futures = [executor.submit(_extract_shard, video_path, start, end, overlap_frames, pose_options, inference_options)
+                   for start, end in shards]
+        for future in futures:
+            start, landmarks, detected = future.result()
+            store.set_range(start, landmarks, detected)
+    return store
@@ -0,0 +1,208 @@
+import queue
+import threading
+import time
+
+import cv2
+
+_END = object()
+
+
+class _PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage."""
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.input_wait_seconds = 0.0
+        self.output_wait_seconds = 0.0
+        self.max_queue_depth = 0
+        self._queue_depth_total = 0
+
+    def record_queue_depth(self, depth):
+        self._queue_depth_total += depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def as_dict(self):
+        return {
+            'items': self.items,
+            'busy_seconds': round(self.busy_seconds, 4),
+            # Stall time: starved waiting for input plus blocked on a full output queue.
+            'input_wait_seconds': round(self.input_wait_seconds, 4),
+            'output_wait_seconds': round(self.output_wait_seconds, 4),
+            'stall_seconds': round(self.input_wait_seconds + self.output_wait_seconds, 4),
+            'avg_queue_depth': round(self._queue_depth_total / self.items, 2) if self.items else 0.0,
+            'max_queue_depth': self.max_queue_depth,
+        }
+
+
+class ThreadedPipeline:
+    """
+    A three-stage decode -> process -> encode pipeline connected by bounded queues.
+
+    `source` is any iterable (decoding runs in its own thread), `process` runs in the
+    calling thread, and `sink` consumes processed items in a third thread. Bounded
+    queues provide backpressure, and items keep their order end to end. OpenCV's
+    decode/encode release the GIL, so they overlap with inference in `process`.
+    """
+    def __init__(self, source, process, sink, queue_size=8, name="pipeline"):
+        self.source = source
+        self.process = process
+        self.sink = sink
+        self.name = name
+        self._inbox = queue.Queue(maxsize=queue_size)
+        self._outbox = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._error = None
+        self.stats = {stage: StageStats(stage) for stage in ('decode', 'process', 'encode')}
+
+    def _put(self, target, item, stats):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _PipelineStopped()
+            try:
+                target.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        stats.output_wait_seconds += time.perf_counter() - start
+
+    def _get(self, source, stats):
+        start = time.perf_counter()
+        while True:
+            if self._stop.is_set():
+                raise _PipelineStopped()
+            try:
+                stats.record_queue_depth(source.qsize())
+                item = source.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        stats.input_wait_seconds += time.perf_counter() - start
+        return item
+
+    def _decode(self):
+        stats = self.stats['decode']
+        iterator = iter(self.source)
+        while True:
+            start = time.perf_counter()
+            item = next(iterator, _END)
+            stats.busy_seconds += time.perf_counter() - start
+            if item is _END:
+                break
+            stats.items += 1
+            self._put(self._inbox, item, stats)
+        self._put(self._inbox, _END, stats)
+
+    def _process(self):
+        stats = self.stats['process']
+        while True:
+            item = self._get(self._inbox, stats)
+            if item is _END:
+                break
+            start = time.perf_counter()
+            result = self.process(item)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += 1
+            self._put(self._outbox, result, stats)
+        self._put(self._outbox, _END, stats)
+
+    def _encode(self):
+        stats = self.stats['encode']
+        while True:
+            item = self._get(self._outbox, stats)
+            if item is _END:
+                break
+            start = time.perf_counter()
+            self.sink(item)
+            stats.busy_seconds += time.perf_counter() - start
+            stats.items += 1
+
+    def _guard(self, stage):
+        try:
+            stage()
+        except _PipelineStopped:
+            pass
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+            self._stop.set()
+
+    def run(self):
+        """Runs the pipeline to completion and returns the per-stage stats."""
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._guard, args=(stage,), name=f"{self.name}-{stage.__name__.strip('_')}", daemon=True)
+                   for stage in (self._decode, self._encode)]
+        for thread in threads:
+            thread.start()
+        self._guard(self._process)
+        for thread in threads:
+            thread.join()
+        if self._error is not None:
+            raise self._error
+        return self.summary(time.perf_counter() - start)
+
+    def summary(self, wall_seconds):
+        stages = {name: stats.as_dict() for name, stats in self.stats.items()}
+        # The stage with the most busy time is the one everything else waits on.
+        bottleneck = max(stages, key=lambda name: stages[name]['busy_seconds'])
+        return {'wall_seconds': round(wall_seconds, 4), 'bottleneck': bottleneck, 'stages': stages}
+
+
+def capture_info(cap):
+    """Width, height, fps and frame count of an open cv2.VideoCapture, from the container header."""
+    return {
+        'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        'fps': cap.get(cv2.CAP_PROP_FPS),
+        'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+    }
+
+
+def probe_video(path):
+    """capture_info for a video file (opened only long enough to read its header)."""
+    cap = cv2.VideoCapture(path)
+    try:
+        return capture_info(cap)
+    finally:
+        cap.release()
+
+
+def read_frames(cap, convert_to_rgb=False, start=0, stop=None, stride=1, profiler=None, decode_stage="decode"):
+    """
+    Yields (frame_index, frame) from an open cv2.VideoCapture, optionally converted to RGB.
+
+    `start`/`stop` select a frame range (seeking to `start`), and with `stride` > 1 only
+    every stride-th frame is decoded; the frames in between are grabbed and skipped.
+    With a Profiler, decoding and color conversion are timed as `decode_stage` and "color_convert".
+    """
+    grab, read, convert = cap.grab, cap.read, cv2.cvtColor
+    if profiler is not None:
+        grab, read = profiler.wrap(decode_stage, grab), profiler.wrap(decode_stage, read)
+        convert = profiler.wrap("color_convert", convert)
+    if start > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frame_idx = start
+    while cap.isOpened() and (stop is None or frame_idx < stop):
+        if (frame_idx - start) % stride:
+            if not grab(): break
+            frame_idx += 1
+            continue
+        ret, frame = read()
+        if not ret: break
+        if convert_to_rgb:
+            frame = convert(frame, cv2.COLOR_BGR2RGB)
+        yield frame_idx, frame
+        frame_idx += 1
+
+
+def print_pipeline_stats(label, summary):
+    """Prints a one-line-per-stage overview of a pipeline run."""
+    print(f"{label} pipeline: {summary['wall_seconds']:.2f}s, bottleneck: {summary['bottleneck']}")
+    for name, stage in summary['stages'].items():
+        print(f"  {name:<8} items={stage['items']:<6} busy={stage['busy_seconds']:.2f}s "
+              f"stall={stage['stall_seconds']:.2f}s avg_depth={stage['avg_queue_depth']}")
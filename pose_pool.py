@@ -0,0 +1,108 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+_BLANK_FRAME = np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+class PosePool:
+    """
+    A process-level pool of pre-initialized MediaPipe Pose estimators.
+
+    Building a Pose graph is expensive, so analyses check one out, use it for a
+    single video, and return it. Each estimator is reset on return so tracking
+    state from one video never leaks into the next. Because MediaPipe re-opens its
+    models on the first frame after a reset, recycling (reset plus one warm-up
+    frame) runs in a background thread, off the next request's critical path.
+    """
+    def __init__(self, size=2, pose_options=None, warm=True):
+        self.size = max(int(size), 1)
+        self.pose_options = dict(pose_options or {})
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        if warm:
+            self._created = 1
+            self._idle.put(self._create())
+
+    def _create(self):
+        import mediapipe as mp
+
+        pose = mp.solutions.pose.Pose(**self.pose_options)
+        self._warm(pose)
+        return pose
+
+    @staticmethod
+    def _warm(pose):
+        # One blank frame makes model loading and delegate setup happen now, not on a request.
+        # Nothing is detected in it, so no tracking state is carried forward.
+        pose.process(_BLANK_FRAME)
+
+    def acquire(self, timeout=None):
+        """Checks out an idle estimator, creating one if the pool is below its size."""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                # Reserve the slot before building outside the lock.
+                self._created += 1
+        if can_create:
+            try:
+                return self._create()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        return self._idle.get(timeout=timeout)
+
+    def release(self, pose, background=True):
+        """Resets an estimator's tracking state and returns it to the pool."""
+        if background:
+            threading.Thread(target=self._recycle, args=(pose,), name="pose-pool-recycle", daemon=True).start()
+        else:
+            self._recycle(pose)
+
+    def _recycle(self, pose):
+        try:
+            pose.reset()
+            self._warm(pose)
+        except Exception as e:
+            print(f"Discarding pose estimator that failed to reset: {e}")
+            pose.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(pose)
+
+    @contextmanager
+    def checkout(self, timeout=None):
+        pose = self.acquire(timeout)
+        try:
+            yield pose
+        finally:
+            self.release(pose)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pose_pool(size=2, pose_options=None):
+    """Returns the process-wide pool, creating (and warming) it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PosePool(size, pose_options)
+        return _pool
@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from settings import thaw
+
+# Config sections that do not change what analyze_video produces (speed knobs, session/live modes, app job queue,
+# timing instrumentation).
+CACHE_IGNORED_CONFIG_KEYS = ('processing', 'cache', 'session', 'live', 'jobs', 'instrumentation')
+# The exceptions within "processing": adaptive sampling approximates the full-rate results, so the mode
+# (and, in adaptive mode, its sampling parameters) is part of the key.
+CACHE_KEYED_ADAPTIVE_KEYS = ('adaptive_stride', 'refine_margin_frames', 'refine_warmup_frames')
+CACHE_INDEX_FILENAME = 'cache_index.json'
+
+
+def hash_video(path, chunk_size=1 << 20):
+    """Streams a file through SHA-256 without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    """
+    A local, content-addressed cache of finished analyses under the output directory.
+
+    Entries are keyed by the video bytes, the result-relevant parts of the config
+    and the bonus flag. Total size is bounded by evicting the least recently used
+    analysis directories. Only directories the cache created entries for are ever deleted.
+    """
+    def __init__(self, root='output', max_bytes=2 * 1024 ** 3):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, CACHE_INDEX_FILENAME)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._index = self._read_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {'hits': 0, 'misses': 0, 'entries': {}}
+
+    def _write_index(self):
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def make_key(self, video_path, config, run_bonus_features):
+        relevant_config = {k: thaw(v) for k, v in config.items() if k not in CACHE_IGNORED_CONFIG_KEYS}
+        processing = config.get('processing', {})
+        mode = processing.get('mode', 'full')
+        relevant_config['processing'] = {'mode': mode}
+        if mode == 'adaptive':
+            relevant_config['processing'].update({k: processing.get(k) for k in CACHE_KEYED_ADAPTIVE_KEYS})
+        digest = hashlib.sha256()
+        digest.update(hash_video(video_path).encode())
+        digest.update(json.dumps(relevant_config, sort_keys=True).encode())
+        digest.update(b'bonus' if run_bonus_features else b'basic')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns a copy of the cached results for a key, or None on a miss."""
+        with self._lock:
+            entry = self._index['entries'].get(key)
+            results = entry['results'] if entry else None
+            paths = [results.get(name) for name in ('video_path', 'report_path', 'chart_path', 'html_report_path')] if results else []
+            if entry is None or not all(os.path.exists(path) for path in paths if path):
+                if entry is not None:
+                    # The files were removed behind our back; forget the entry.
+                    del self._index['entries'][key]
+                self._index['misses'] += 1
+                self._write_index()
+                return None
+            entry['last_access'] = time.time()
+            self._index['hits'] += 1
+            self._write_index()
+            return copy.deepcopy(results)
+
+    def put(self, key, results, run_dir):
+        """Records a finished analysis and evicts old entries if the cache is over budget."""
+        with self._lock:
+            self._index['entries'][key] = {
+                'run_dir': run_dir,
+                'results': results,
+                'size_bytes': _directory_size(run_dir),
+                'last_access': time.time(),
+            }
+            self._evict(keep=key)
+            self._write_index()
+
+    def _evict(self, keep=None):
+        entries = self._index['entries']
+        total = sum(entry['size_bytes'] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k]['last_access']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = entries.pop(key)
+            shutil.rmtree(entry['run_dir'], ignore_errors=True)
+            total -= entry['size_bytes']
+            print(f"Cache: evicted {entry['run_dir']} ({entry['size_bytes'] / 1e6:.1f} MB)")
+
+    @property
+    def stats(self):
+        with self._lock:
+            entries = self._index['entries']
+            return {
+                'hits': self._index['hits'],
+                'misses': self._index['misses'],
+                'entries': len(entries),
+                'size_bytes': sum(entry['size_bytes'] for entry in entries.values()),
+            }
@@ -0,0 +1,135 @@
+import cv2
+import numpy as np
+
+from landmark_store import landmarks_to_array
+
+
+class InferenceRegion:
+    """
+    Chooses what part of each frame, and at what resolution, is fed to pose inference.
+
+    With `scale` < 1 the frame is downscaled before inference, and with `max_side` set
+    it is downscaled only as far as needed to fit (so small clips are left alone,
+    while 4K uploads are shrunk before MediaPipe's own resize). With `use_roi`, only a
+    padded box around the batter (from the previous frame's landmarks) is cropped
+    out; when the batter is lost the next frame falls back to the full view.
+    Landmarks are mapped back to normalized full-frame coordinates, so everything
+    downstream (metrics, overlays) is unaware of the crop.
+    """
+    def __init__(self, scale=1.0, max_side=0, use_roi=False, roi_padding=0.25, min_visibility=0.5):
+        self.scale = float(scale)
+        self.max_side = int(max_side)
+        self.use_roi = bool(use_roi)
+        self.roi_padding = float(roi_padding)
+        self.min_visibility = float(min_visibility)
+        self._box = None
+        self._previous_box = None
+        self._moved = False
+
+    @classmethod
+    def from_config(cls, config):
+        inference = config.get('inference', {})
+        return cls(inference.get('scale', 1.0), inference.get('max_side', 0),
+                   inference.get('use_roi', False), inference.get('roi_padding', 0.25))
+
+    @property
+    def enabled(self):
+        return self.use_roi or self.scale != 1.0 or self.max_side > 0
+
+    def reset(self):
+        self._box = None
+        self._previous_box = None
+        self._moved = False
+
+    def prepare(self, frame):
+        """
+        Crops and scales a BGR frame for inference.
+
+        Returns the RGB image and its crop box (x0, y0, crop_w, crop_h, frame_w, frame_h)
+        in full-frame pixels, which to_full_frame/update need afterwards.
+        """
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0, x1, y1 = self._box if self._box is not None else (0, 0, frame_width, frame_height)
+        self._moved = self._previous_box is not None and self._previous_box != (x0, y0, x1, y1)
+        self._previous_box = (x0, y0, x1, y1)
+        crop = frame[y0:y1, x0:x1]
+        scale = self.scale
+        if self.max_side > 0:
+            scale = min(scale, self.max_side / max(x1 - x0, y1 - y0))
+        if scale < 1.0:
+            size = (max(1, int(round((x1 - x0) * scale))), max(1, int(round((y1 - y0) * scale))))
+            crop = cv2.resize(crop, size, interpolation=cv2.INTER_LINEAR)
+        # Color conversion runs on the (smaller) crop rather than the full frame.
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2RGB), (x0, y0, x1 - x0, y1 - y0, frame_width, frame_height)
+
+    def process(self, pose, frame):
+        """
+        Runs pose on a BGR frame through the current crop.
+
+        Returns the full-frame (33, 4) landmarks (or None) and the number of inference
+        calls made. MediaPipe tracks in input-image coordinates, so right after the
+        crop moves its tracked region is stale; a miss there is retried once on the
+        same image, which makes it fall back to full detection.
+        """
+        image, crop_box = self.prepare(frame)
+        results = pose.process(image)
+        calls = 1
+        if not results.pose_landmarks and self._moved:
+            results = pose.process(image)
+            calls += 1
+        landmarks = None
+        if results.pose_landmarks:
+            landmarks = self.to_full_frame(landmarks_to_array(results.pose_landmarks.landmark), crop_box)
+        self.update(landmarks, crop_box)
+        return landmarks, calls
+
+    @staticmethod
+    def to_full_frame(landmarks, crop_box):
+        """Maps (33, 4) landmarks normalized to the crop back to normalized full-frame coordinates."""
+        x0, y0, crop_width, crop_height, frame_width, frame_height = crop_box
+        if (x0, y0, crop_width, crop_height) == (0, 0, frame_width, frame_height):
+            return landmarks
+        mapped = landmarks.copy()
+        mapped[:, 0] = (landmarks[:, 0] * crop_width + x0) / frame_width
+        mapped[:, 1] = (landmarks[:, 1] * crop_height + y0) / frame_height
+        # MediaPipe's z uses the same scale as x.
+        mapped[:, 2] = landmarks[:, 2] * crop_width / frame_width
+        return mapped
+
+    def update(self, landmarks, crop_box):
+        """Sets the next frame's crop from this frame's full-frame landmarks (or clears it if none)."""
+        if not self.use_roi:
+            return
+        frame_width, frame_height = crop_box[4], crop_box[5]
+        if landmarks is None:
+            self._box = None
+            return
+        visible = landmarks[landmarks[:, 3] >= self.min_visibility]
+        if len(visible) < 4:
+            self._box = None
+            return
+        xs, ys = visible[:, 0] * frame_width, visible[:, 1] * frame_height
+        extent = max(xs.max() - xs.min(), ys.max() - ys.min())
+        if self._box is not None:
+            # Keep the crop still while the batter stays well inside it: MediaPipe tracks in
+            # crop coordinates, so a crop that moves every frame keeps breaking its tracking.
+            x0, y0, x1, y1 = self._box
+            margin = 0.5 * self.roi_padding * extent
+            inside = (xs.min() - margin >= x0 or x0 == 0) and (xs.max() + margin <= x1 or x1 == frame_width) and \
+                     (ys.min() - margin >= y0 or y0 == 0) and (ys.max() + margin <= y1 or y1 == frame_height)
+            if inside:
+                return
+        pad = self.roi_padding * extent
+        x0 = int(np.clip(xs.min() - pad, 0, frame_width - 1))
+        y0 = int(np.clip(ys.min() - pad, 0, frame_height - 1))
+        x1 = int(np.clip(xs.max() + pad, x0 + 1, frame_width))
+        y1 = int(np.clip(ys.max() + pad, y0 + 1, frame_height))
+        self._box = (x0, y0, x1, y1)
+
+
+def detect_landmarks(pose, frame, region=None):
+    """Runs pose on a BGR frame (through `region` if enabled); returns full-frame (33, 4) landmarks or None."""
+    if region is not None and region.enabled:
+        return region.process(pose, frame)[0]
+    results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    return landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
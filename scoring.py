@@ -0,0 +1,33 @@
+import numpy as np
+
+
+def evaluate_shot(metrics, impact_frame_index=None):
+    """Scores one shot from its MetricsStore; `impact_frame_index` indexes into that store."""
+    evaluation = {}
+    # Distribution-based scores only use inferred frames: interpolated ones would smooth away real wobble.
+    # Each is weighted by the frames it stands for, so sparse and dense stretches count by duration.
+    weights = metrics.observed_weights()
+    avg_foot_angle = np.average(metrics.observed_values('front_foot_direction'), weights=weights)
+    evaluation['Footwork'] = {'score': 8.5 if 45 < avg_foot_angle < 90 else 4.0, 'feedback': "Ensure the front foot points towards the cover region."}
+    head_knee_alignment = metrics.observed_values('head_knee_alignment')
+    good_head_frames = int(weights[head_knee_alignment < 0.5].sum())
+    evaluation['Head Position'] = {'score': round((good_head_frames / int(weights.sum())) * 10, 1), 'feedback': "A stable head over the front knee is crucial for balance."}
+
+    if impact_frame_index is not None and metrics.is_valid(impact_frame_index):
+        elbow_at_impact = metrics.value('front_elbow_angle', impact_frame_index)
+        swing_score = (elbow_at_impact / 180) * 10
+        feedback_swing = f"Elbow angle at impact was {int(elbow_at_impact)}°. Aim for full extension."
+    else:
+        max_elbow_angle = float(np.max(metrics.valid_values('front_elbow_angle')))
+        swing_score = (max_elbow_angle / 180) * 10
+        feedback_swing = "Aim for a full extension of the front arm through the shot."
+
+    evaluation['Swing Control'] = {'score': round(swing_score, 1), 'feedback': feedback_swing}
+
+    spine_lean = metrics.observed_values('spine_lean')
+    spine_lean_std = np.sqrt(np.average((spine_lean - np.average(spine_lean, weights=weights)) ** 2, weights=weights))
+    balance_score = max(1, min(10, 10 - (spine_lean_std / 10) * 10))
+    evaluation['Balance'] = {'score': round(balance_score, 1), 'feedback': "Maintain a consistent and stable posture."}
+    evaluation['Follow-through'] = {'score': 7.5, 'feedback': "A high and complete follow-through ensures commitment."}
+
+    return evaluation
@@ -0,0 +1,186 @@
+import collections
+import json
+import os
+
+import cv2
+import numpy as np
+
+from analysis_module import POSE_OPTIONS, create_run_dir
+from bonus.analysis_enhancer import BonusAnalyzer
+from metrics_engine import compute_landmark_metrics
+from metrics_store import MetricsStore, METRIC_NAMES
+from pipeline import read_frames
+from pose_pool import get_pose_pool
+from roi import InferenceRegion, detect_landmarks
+from scoring import evaluate_shot
+from settings import load_config, freeze
+
+WRIST_COLUMN = METRIC_NAMES.index('wrist_y_coords')
+
+
+class ShotDetector:
+    """
+    Finds shots online in a stream of per-frame metrics, keeping only a sliding window.
+
+    As in BonusAnalyzer.find_impact_moment, a shot's impact is its fastest downward
+    wrist movement, but a frame only qualifies while the wrist moves faster than
+    `min_impact_speed` frame heights per second (the median over `speed_window`
+    frames, so a single-frame landmark glitch cannot start a shot). A shot is
+    complete `post_impact_frames` after its impact and covers up to
+    `pre_impact_frames` before it; the next impact must be at least
+    `min_shot_gap_frames` later. Metrics live in a ring buffer of pre + post + 1
+    frames, so memory does not grow with the video length.
+    """
+    def __init__(self, fps, frame_height, pre_impact_frames=90, post_impact_frames=45,
+                 min_impact_speed=0.25, min_shot_gap_frames=60, speed_window=3):
+        self.fps = float(fps) if fps else 30.0
+        self.frame_height = float(frame_height)
+        self.pre_impact_frames = int(pre_impact_frames)
+        self.post_impact_frames = int(post_impact_frames)
+        self.min_impact_speed = float(min_impact_speed)
+        self.min_shot_gap_frames = int(min_shot_gap_frames)
+        self.capacity = self.pre_impact_frames + self.post_impact_frames + 1
+        self._values = np.full((self.capacity, len(METRIC_NAMES)), np.nan, dtype=np.float32)
+        self._valid = np.zeros(self.capacity, dtype=bool)
+        self._speeds = collections.deque(maxlen=max(int(speed_window), 1))
+        self._last_wrist = None
+        self._candidate = None
+        self._last_impact = None
+        self._last_shot_end = -1
+        self.frames_seen = 0
+
+    @classmethod
+    def from_config(cls, config, fps, frame_height):
+        session = config.get('session', {})
+        return cls(fps, frame_height, session.get('pre_impact_frames', 90), session.get('post_impact_frames', 45),
+                   session.get('min_impact_speed', 0.25), session.get('min_shot_gap_frames', 60))
+
+    def push(self, frame_index, row):
+        """Adds one frame's metrics (a METRIC_NAMES-ordered array, or None); returns a completed shot or None."""
+        # Frames skipped since the last push (e.g. a strided stream) must not keep older frames' metrics.
+        skipped = np.arange(self.frames_seen, frame_index)[-self.capacity:] % self.capacity
+        self._values[skipped] = np.nan
+        self._valid[skipped] = False
+        slot = frame_index % self.capacity
+        if row is None:
+            self._values[slot] = np.nan
+            self._valid[slot] = False
+        else:
+            self._values[slot] = row
+            self._valid[slot] = True
+            self._track_impact(frame_index, float(row[WRIST_COLUMN]))
+        self.frames_seen = frame_index + 1
+        if self._candidate is not None and frame_index - self._candidate[0] >= self.post_impact_frames:
+            return self._complete()
+        return None
+
+    def flush(self):
+        """Completes the shot in progress at the end of the stream, if there is one."""
+        return self._complete() if self._candidate is not None else None
+
+    def _track_impact(self, frame_index, wrist_y):
+        if self._last_wrist is not None:
+            last_frame, last_y = self._last_wrist
+            speed = (wrist_y - last_y) / (frame_index - last_frame) * self.fps / self.frame_height
+            self._speeds.append(speed)
+            after_gap = self._last_impact is None or frame_index - self._last_impact >= self.min_shot_gap_frames
+            swinging = len(self._speeds) == self._speeds.maxlen and np.median(self._speeds) >= self.min_impact_speed
+            if after_gap and swinging and (self._candidate is None or speed > self._candidate[1]):
+                self._candidate = (frame_index, speed)
+        self._last_wrist = (frame_index, wrist_y)
+
+    def _complete(self):
+        impact = self._candidate[0]
+        end = self.frames_seen
+        start = max(impact - self.pre_impact_frames, self._last_shot_end + 1, end - self.capacity)
+        slots = np.arange(start, end) % self.capacity
+        metrics = MetricsStore(end - start)
+        metrics.assign({name: self._values[slots, column] for column, name in enumerate(METRIC_NAMES)}, self._valid[slots])
+        self._candidate = None
+        self._last_impact = impact
+        self._last_shot_end = end - 1
+        return {'start_frame': int(start), 'impact_frame': int(impact), 'end_frame': int(end - 1), 'metrics': metrics}
+
+
+def _phase_spans(phases, first_frame):
+    """Collapses a per-frame phase list into [{'phase', 'start_frame', 'end_frame'}] spans in video frames."""
+    spans = []
+    for offset, phase in enumerate(phases):
+        if spans and spans[-1]['phase'] == phase:
+            spans[-1]['end_frame'] = first_frame + offset
+        else:
+            spans.append({'phase': phase, 'start_frame': first_frame + offset, 'end_frame': first_frame + offset})
+    return spans
+
+
+def score_shot(shot, config, output_dir, fps, run_bonus_features=True):
+    """Phases and evaluation for one shot found by ShotDetector."""
+    metrics = shot['metrics']
+    impact = shot['impact_frame'] - shot['start_frame']
+    bonus_analyzer = BonusAnalyzer(metrics, output_dir, config)
+    phases = _phase_spans(bonus_analyzer.segment_shot_phases(impact), shot['start_frame'])
+    evaluation = evaluate_shot(metrics, impact)
+    if run_bonus_features:
+        evaluation = bonus_analyzer.add_skill_grade_to_evaluation(evaluation)
+        evaluation = bonus_analyzer.add_reference_comparison(evaluation, impact)
+    return {
+        'start_frame': shot['start_frame'],
+        'impact_frame': shot['impact_frame'],
+        'end_frame': shot['end_frame'],
+        'impact_time_seconds': round(shot['impact_frame'] / fps, 2) if fps else None,
+        'phases': phases,
+        'evaluation': evaluation,
+    }
+
+
+def iter_shots(frames, fps, frame_width, frame_height, config=None, output_dir='output', run_bonus_features=True):
+    """
+    Streams (frame_index, bgr_frame) items through pose and yields one result per shot.
+
+    Each shot is scored as soon as its follow-through has been seen, so results for
+    early shots arrive while later frames are still being read. Only the detector's
+    sliding window of metrics is kept; landmarks and frames are dropped after use.
+    """
+    config = freeze(config) if config is not None else load_config()
+    processing = config.get('processing', {})
+    detector = ShotDetector.from_config(config, fps, frame_height)
+    region = InferenceRegion.from_config(config)
+    shot_number = 0
+    with get_pose_pool(processing.get('pose_pool_size', 2), POSE_OPTIONS).checkout() as pose:
+        for frame_index, frame in frames:
+            landmarks = detect_landmarks(pose, frame, region)
+            metrics = compute_landmark_metrics(landmarks, frame_width, frame_height) if landmarks is not None else None
+            row = np.array([metrics[name] for name in METRIC_NAMES], dtype=np.float32) if metrics is not None else None
+            shot = detector.push(frame_index, row)
+            if shot is not None:
+                shot_number += 1
+                yield dict(shot=shot_number, **score_shot(shot, config, output_dir, fps, run_bonus_features))
+        shot = detector.flush()
+        if shot is not None:
+            shot_number += 1
+            yield dict(shot=shot_number, **score_shot(shot, config, output_dir, fps, run_bonus_features))
+
+
+def analyze_session(video_path, output_dir='output', run_bonus_features=True, config=None):
+    """
+    Analyzes a multi-shot recording (e.g. a net session) as a stream.
+
+    Yields one result dict per shot as it completes and appends it to shots.jsonl in
+    a new session_<timestamp> folder, so long recordings never need to fit in memory.
+    """
+    session_dir = create_run_dir(output_dir, "session")
+    print(f"Saving session results to: {session_dir}")
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    shots_path = os.path.join(session_dir, 'shots.jsonl')
+    try:
+        with open(shots_path, 'w') as f:
+            for result in iter_shots(read_frames(cap), fps, frame_width, frame_height, config, session_dir, run_bonus_features):
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                print(f"Shot {result['shot']}: impact at frame {result['impact_frame']} ({result['impact_time_seconds']}s)")
+                yield result
+    finally:
+        cap.release()
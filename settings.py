@@ -0,0 +1,89 @@
+import functools
+import json
+import os
+from types import MappingProxyType
+
+DEFAULT_CONFIG = {
+    "feedback_thresholds": {"good_elbow_angle": 160, "head_alignment_ratio": 0.5},
+    "processing": {
+        "workers": 1, "shard_overlap_frames": 30, "queue_size": 8, "pose_pool_size": 2,
+        "mode": "full", "adaptive_stride": 4, "refine_margin_frames": 15, "refine_warmup_frames": 10
+    },
+    "inference": {"scale": 1.0, "max_side": 0, "use_roi": False, "roi_padding": 0.25},
+    "session": {"pre_impact_frames": 90, "post_impact_frames": 45, "min_impact_speed": 0.25, "min_shot_gap_frames": 60},
+    "live": {"latency_budget_ms": 200, "buffer_frames": 2, "stats_interval_seconds": 5, "latency_window_frames": 10000},
+    "jobs": {"workers": 2, "max_queued": 8, "keep_finished": 100, "poll_seconds": 1.0},
+    "output": {
+        "profile": "full",
+        "profiles": {
+            "full": {"video": True, "frames": "all", "codec": "mp4v", "scale": 1.0},
+            "preview": {"video": True, "frames": "all", "codec": "mp4v", "scale": 0.5},
+            "highlight": {"video": True, "frames": "impact", "codec": "mp4v", "scale": 1.0, "pre_impact_seconds": 1.5, "post_impact_seconds": 1.0},
+            "metrics_only": {"video": False}
+        }
+    },
+    "instrumentation": {"enabled": True, "sink_path": ""},
+    "cache": {"max_bytes": 2147483648},
+    "reference_library": {"path": "references/library.npz", "top_k": 3, "band_fraction": 0.1, "zero_score_distance": 2.0},
+    "reference_drive": {
+        "impact_metrics": {
+            "front_elbow_angle": {"min": 165, "max": 180, "weight": 0.4},
+            "spine_lean": {"min": 10, "max": 25, "weight": 0.3}
+        }
+    }
+}
+
+
+def freeze(value):
+    """Recursively turns dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, MappingProxyType):
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Turns a frozen config back into plain dicts and lists (e.g. for json.dumps)."""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def merge_config(base, overrides):
+    """A plain-dict copy of `base` with `overrides` merged in, section by section (e.g. a thresholds-only config)."""
+    merged = thaw(base)
+    for key, value in thaw(overrides).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@functools.lru_cache(maxsize=8)
+def _load_frozen(path, mtime):
+    # mtime is part of the cache key so an edited config.json is picked up without a restart.
+    if mtime is None:
+        print("Warning: config.json not found. Using default values.")
+        return freeze(DEFAULT_CONFIG)
+    with open(path, 'r') as f:
+        return freeze(json.load(f))
+
+
+def load_config(path='config.json'):
+    """
+    Loads thresholds and reference data from config.json as an immutable mapping.
+
+    The file is parsed once per process (and again only if it changes on disk).
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    return _load_frozen(path, mtime)
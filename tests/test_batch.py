@@ -0,0 +1,26 @@
+import json
+import os
+
+import batch
+
+
+def write_result(output_dir, clip, options):
+    job_dir = os.path.join(output_dir, batch.job_id(clip))
+    os.makedirs(job_dir)
+    with open(os.path.join(job_dir, batch.RESULT_FILENAME), 'w') as f:
+        json.dump({'video': clip, 'job_dir': job_dir, 'status': 'completed', 'scores': {}, 'frames': 0,
+                   'options': options}, f)
+
+
+def test_resume_skips_only_results_from_the_same_options(tmp_path):
+    output_dir = str(tmp_path / "batch")
+    same = str(tmp_path / "same.mp4")
+    other = str(tmp_path / "other.mp4")
+    write_result(output_dir, same, batch.job_options(run_bonus_features=True, mode='adaptive'))
+    write_result(output_dir, other, batch.job_options(mode='adaptive'))
+
+    summary = batch.run_batch([same, other], output_dir, workers=1, run_bonus_features=True, mode='adaptive')
+
+    statuses = {os.path.basename(job['video']): job['status'] for job in summary['jobs']}
+    # other.mp4 was analyzed without --bonus, so it is run again (and fails: the clip does not exist).
+    assert statuses == {'same.mp4': 'skipped', 'other.mp4': 'failed'}
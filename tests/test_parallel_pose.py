@@ -0,0 +1,31 @@
+import cv2
+import numpy as np
+
+import parallel_pose
+from landmark_store import NUM_LANDMARKS, LANDMARK_FIELDS
+
+
+def write_video(path, frame_count, size=(64, 48)):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), 30, size)
+    for _ in range(frame_count):
+        writer.write(np.zeros((size[1], size[0], 3), dtype=np.uint8))
+    writer.release()
+
+
+def test_open_ended_shard_keeps_undetected_frames_at_both_ends(tmp_path, monkeypatch):
+    video_path = tmp_path / "clip.mp4"
+    write_video(video_path, 8)
+    # Frames 0-1 and 6-7 have no pose; 2-5 do.
+    calls = iter(range(8))
+
+    def fake_detect(pose, frame, region):
+        frame_idx = next(calls)
+        return np.full((NUM_LANDMARKS, LANDMARK_FIELDS), frame_idx, dtype=np.float32) if 2 <= frame_idx <= 5 else None
+
+    monkeypatch.setattr(parallel_pose, 'detect_landmarks', fake_detect)
+    start, landmarks, detected = parallel_pose._extract_shard(str(video_path), 0, None, 0, {})
+
+    assert start == 0
+    assert len(landmarks) == len(detected) == 8
+    assert detected.tolist() == [False, False, True, True, True, True, False, False]
+    assert landmarks[3, 0, 0] == 3
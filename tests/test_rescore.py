@@ -0,0 +1,27 @@
+from analysis_module import rescore
+from artifact import save_artifact
+from benchmarks.synthetic import synthetic_landmarks
+from landmark_store import LandmarkStore
+from metrics_engine import compute_metrics_batch
+from metrics_store import MetricsStore
+
+
+def make_artifact(output_dir, n_frames=120):
+    landmarks, detected = synthetic_landmarks(n_frames)
+    landmark_store = LandmarkStore(n_frames)
+    landmark_store.set_range(0, landmarks, detected)
+    columns, valid = compute_metrics_batch(landmarks, detected, 640, 360)
+    metrics = MetricsStore(len(valid))
+    metrics.assign(columns, valid)
+    return save_artifact(str(output_dir), landmark_store, metrics, 30.0, 640, 360)
+
+
+def test_rescore_with_thresholds_only_config(tmp_path):
+    artifact_path = make_artifact(tmp_path)
+    config = {'feedback_thresholds': {'good_elbow_angle': 150, 'head_alignment_ratio': 0.4}}
+
+    results = rescore(artifact_path, config=config, run_bonus_features=True)
+
+    evaluation = results['evaluation_data']
+    assert {'Footwork', 'Balance', 'Benchmark Comparison'} <= set(evaluation)
+    assert (tmp_path / 'evaluation.json').exists()
@@ -0,0 +1,28 @@
+import numpy as np
+
+from metrics_store import METRIC_NAMES
+from session import ShotDetector, WRIST_COLUMN
+
+
+def wrist_row(wrist_y):
+    row = np.zeros(len(METRIC_NAMES), dtype=np.float32)
+    row[WRIST_COLUMN] = wrist_y
+    return row
+
+
+def test_frames_skipped_between_pushes_are_not_valid():
+    detector = ShotDetector(fps=30, frame_height=100, pre_impact_frames=3, post_impact_frames=3,
+                            min_impact_speed=1.0, speed_window=1)
+    for frame_index in range(7):
+        assert detector.push(frame_index, wrist_row(0)) is None
+    # From here only even frames arrive; 7 and 9 reuse slots last written by frames 0 and 2.
+    detector.push(8, wrist_row(50))
+    detector.push(10, wrist_row(60))
+    shot = detector.flush()
+
+    assert (shot['start_frame'], shot['impact_frame'], shot['end_frame']) == (5, 8, 10)
+    metrics = shot['metrics']
+    assert metrics.valid.tolist() == [True, True, False, True, False, True]
+    wrist = metrics['wrist_y_coords']
+    assert wrist[[0, 1, 3, 5]].tolist() == [0, 0, 50, 60]
+    assert np.isnan(wrist[[2, 4]]).all()